@@ -1,12 +1,16 @@
 from .bmi_tools import calculate_bmi
 from .calorie_tools import calculate_daily_calories, estimate_meal_calories
 from .workout_tool import suggest_workout, workout_duration_calculator
+from .tool_registry import TOOLS, function_declarations, run_with_tools
 
 __all__ = [
     "calculate_bmi",
     "calculate_daily_calories",
     "estimate_meal_calories",
     "suggest_workout",
-    "workout_duration_calculator"
+    "workout_duration_calculator",
+    "TOOLS",
+    "function_declarations",
+    "run_with_tools",
 ]
 
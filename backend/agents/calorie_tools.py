@@ -1,3 +1,5 @@
+from typing import List, Literal
+
 CALORIE_TABLE = {
     # Fruits
     "apple": 95,
@@ -132,9 +134,13 @@ PLAN_TABLE = {
     "cutting_dinner": "Lean turkey, steamed veggies, salad",
 }
 
+# Foods estimate_meal_calories knows, one entry per serving
+MealItem = Literal[tuple(CALORIE_TABLE)]
+
 
 
-def calculate_daily_calories(weight, height, age, gender, activity_level):
+def calculate_daily_calories(weight: float, height: float, age: int, gender: Literal["male", "female"],
+                             activity_level: Literal["low", "medium", "high"]) -> float:
     """
     Simple calorie calculator using Mifflin-St Jeor Equation.
     """
@@ -152,7 +158,7 @@ def calculate_daily_calories(weight, height, age, gender, activity_level):
     return round(bmr * factors.get(activity_level, 1.2), 2)
 
 
-def estimate_meal_calories(meal_items: list):
+def estimate_meal_calories(meal_items: List[MealItem]) -> int:
     """
     Estimate calories from a list of items using a local lookup table.
     The function returns only the total, but richer tables are kept
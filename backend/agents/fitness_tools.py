@@ -1,4 +1,7 @@
-def calculate_body_fat(weight_kg: float, height_cm: float, age: int, gender: str) -> dict:
+from typing import Literal
+
+
+def calculate_body_fat(weight_kg: float, height_cm: float, age: int, gender: Literal["male", "female"]) -> dict:
     """
     Calculate estimated body fat percentage using Deurenberg formula.
     Returns body fat percentage and category.
@@ -44,7 +47,7 @@ def calculate_body_fat(weight_kg: float, height_cm: float, age: int, gender: str
     }
 
 
-def calculate_ideal_weight(height_cm: float, gender: str) -> dict:
+def calculate_ideal_weight(height_cm: float, gender: Literal["male", "female"]) -> dict:
     """
     Calculate ideal weight range using Robinson formula.
     Returns min and max ideal weight in kg.
@@ -70,7 +73,12 @@ def calculate_ideal_weight(height_cm: float, gender: str) -> dict:
     }
 
 
-def calculate_protein_needs(weight_kg: float, activity_level: str = "moderate") -> dict:
+def calculate_protein_needs(
+    weight_kg: float,
+    activity_level: Literal[
+        "sedentary", "moderate", "active", "very_active", "athlete", "bodybuilder", "cutting_phase"
+    ] = "moderate",
+) -> dict:
     """
     Calculate daily protein needs based on weight and activity level.
     Returns protein in grams.
@@ -99,7 +107,12 @@ def calculate_protein_needs(weight_kg: float, activity_level: str = "moderate")
     }
 
 
-def calculate_water_intake(weight_kg: float, activity_level: str = "moderate") -> dict:
+def calculate_water_intake(
+    weight_kg: float,
+    activity_level: Literal[
+        "sedentary", "moderate", "active", "very_active", "athlete", "hot_weather", "intense_training"
+    ] = "moderate",
+) -> dict:
     """
     Calculate daily water intake in liters.
     Base: 35ml per kg body weight, plus activity adjustment.
@@ -154,7 +167,10 @@ def calculate_heart_rate_zones(age: int) -> dict:
     }
 
 
-def calculate_macros(total_calories: float, goal: str = "maintain") -> dict:
+def calculate_macros(
+    total_calories: float,
+    goal: Literal["weight_loss", "muscle_gain", "maintain", "keto"] = "maintain",
+) -> dict:
     """
     Calculate macronutrient breakdown based on total calories and goal.
     Returns protein, carbs, and fat in grams and percentages.
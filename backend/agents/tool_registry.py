@@ -0,0 +1,259 @@
+import inspect
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Literal, get_args, get_origin
+
+from .bmi_tools import calculate_bmi
+from .calorie_tools import calculate_daily_calories, estimate_meal_calories
+from .fitness_tools import (
+    calculate_body_fat,
+    calculate_heart_rate_zones,
+    calculate_ideal_weight,
+    calculate_macros,
+    calculate_protein_needs,
+    calculate_water_intake,
+)
+from .workout_tool import suggest_workout, workout_duration_calculator
+
+TOOLS = {
+    fn.__name__: fn
+    for fn in (
+        calculate_bmi,
+        calculate_daily_calories,
+        estimate_meal_calories,
+        calculate_body_fat,
+        calculate_ideal_weight,
+        calculate_protein_needs,
+        calculate_water_intake,
+        calculate_heart_rate_zones,
+        calculate_macros,
+        suggest_workout,
+        workout_duration_calculator,
+    )
+}
+
+# Stop after this many call/answer rounds with the model
+MAX_TOOL_ROUNDS = 3
+
+_JSON_TYPES = {
+    int: "integer",
+    float: "number",
+    str: "string",
+    bool: "boolean",
+    list: "array",
+    dict: "object",
+}
+
+# Units and formats the model can't infer from a parameter name
+PARAMETER_DESCRIPTIONS = {
+    "weight": "Body weight in kg",
+    "weight_kg": "Body weight in kg",
+    "height": "Height in cm",
+    "height_cm": "Height in cm",
+    "age": "Age in years",
+    "total_calories": "Daily calories in kcal",
+    "sets": "Number of sets",
+    "reps": "Reps per set",
+    "rest_sec": "Rest between sets in seconds",
+    "meal_items": "One food per serving, e.g. [\"egg\", \"egg\"] for two eggs",
+}
+
+# Questions worth sending through the tool-calling path
+TOOL_HINT_RE = re.compile(
+    r"\b(bmi|calorie|calories|kcal|tdee|bmr|protein|water|hydrat\w*|body ?fat|"
+    r"ideal weight|macro|macros|heart ?rate|hr zones?|duration|how long)\b",
+    re.I,
+)
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="tools")
+
+
+def needs_tools(user_message: str) -> bool:
+    return bool(TOOL_HINT_RE.search(user_message))
+
+
+# ----------------------------
+#   Function Declarations
+# ----------------------------
+def _schema(annotation) -> dict:
+    """
+    JSON schema for an annotation. Literal[...] becomes a string enum,
+    so the model can only pick values the calculator knows.
+    """
+    origin = get_origin(annotation)
+    if origin is Literal:
+        return {"type": "string", "format": "enum", "enum": list(get_args(annotation))}
+    if origin is list:
+        args = get_args(annotation)
+        return {"type": "array", "items": _schema(args[0]) if args else {"type": "string"}}
+
+    json_type = _JSON_TYPES.get(annotation, "string")
+    if json_type == "array":
+        return {"type": "array", "items": {"type": "string"}}
+    return {"type": json_type}
+
+
+def declare(fn) -> dict:
+    """
+    Build a function declaration from a typed signature and its docstring.
+    """
+    properties, required = {}, []
+    for name, param in inspect.signature(fn).parameters.items():
+        properties[name] = _schema(param.annotation)
+        if name in PARAMETER_DESCRIPTIONS:
+            properties[name]["description"] = PARAMETER_DESCRIPTIONS[name]
+        if param.default is inspect.Parameter.empty:
+            required.append(name)
+
+    doc = inspect.getdoc(fn) or fn.__name__
+    return {
+        "name": fn.__name__,
+        "description": " ".join(doc.split()),
+        "parameters": {"type": "object", "properties": properties, "required": required},
+    }
+
+
+def function_declarations() -> list:
+    return [declare(fn) for fn in TOOLS.values()]
+
+
+def gemini_tools() -> list:
+    return [{"function_declarations": function_declarations()}]
+
+
+# ----------------------------
+#   Local Execution
+# ----------------------------
+def _coerce(value, annotation):
+    origin = get_origin(annotation)
+    if origin is Literal:
+        choices = get_args(annotation)
+        choice = str(value).strip().lower()
+        if choice not in choices:
+            listed = ", ".join(choices) if len(choices) <= 12 else "the declared enum values"
+            raise ValueError(f"{value!r} is not one of: {listed}")
+        return choice
+    if origin is list:
+        items = value.split(",") if isinstance(value, str) else list(value)
+        args = get_args(annotation)
+        return [_coerce(item, args[0]) if args else str(item) for item in items]
+
+    if annotation is int:
+        return int(round(float(value)))
+    if annotation is float:
+        return float(value)
+    if annotation is list:
+        return [str(item) for item in value] if not isinstance(value, str) else value.split(",")
+    if annotation is str:
+        return str(value)
+    return value
+
+
+def call_tool(name: str, args: dict):
+    """
+    Run one tool call with its arguments coerced to the declared types.
+    Errors, including values outside a Literal's choices, are returned
+    to the model instead of raised, so it can retry with a valid value.
+    """
+    fn = TOOLS.get(name)
+    if fn is None:
+        return {"error": f"Unknown tool: {name}"}
+
+    try:
+        params = inspect.signature(fn).parameters
+        kwargs = {
+            key: _coerce(value, params[key].annotation)
+            for key, value in args.items()
+            if key in params
+        }
+        return fn(**kwargs)
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def _cache_key(name: str, args: dict) -> tuple:
+    return name, tuple(sorted((key, repr(value)) for key, value in args.items()))
+
+
+def execute_calls(calls: list, cache: dict = None) -> list:
+    """
+    Run (name, args) calls, concurrently when there are several.
+    `cache` lives for one turn, so repeated calls are answered once.
+    """
+    cache = {} if cache is None else cache
+    keys = [_cache_key(name, args) for name, args in calls]
+
+    pending = {}
+    for key, (name, args) in zip(keys, calls):
+        if key not in cache and key not in pending:
+            pending[key] = (name, args)
+
+    if len(pending) == 1:
+        key, (name, args) = next(iter(pending.items()))
+        cache[key] = call_tool(name, args)
+    elif pending:
+        futures = {key: _executor.submit(call_tool, name, args) for key, (name, args) in pending.items()}
+        for key, future in futures.items():
+            cache[key] = future.result()
+
+    return [cache[key] for key in keys]
+
+
+# ----------------------------
+#   Model Loop
+# ----------------------------
+def _parts(response) -> list:
+    try:
+        return list(response.candidates[0].content.parts)
+    except (AttributeError, IndexError):
+        return []
+
+
+def _function_calls(response) -> list:
+    calls = []
+    for part in _parts(response):
+        call = getattr(part, "function_call", None)
+        if call is not None and getattr(call, "name", ""):
+            calls.append((call.name, dict(call.args or {})))
+    return calls
+
+
+def _text(response) -> str:
+    return "".join(getattr(part, "text", "") or "" for part in _parts(response))
+
+
+def run_with_tools(client, prompt: str, on_first_response=None) -> str:
+    """
+    Ask the model, run any tool calls it makes locally, feed the
+    results back and return its final text answer.
+
+    `on_first_response()` is called once the first model response
+    arrives, so callers can time the model apart from the tool rounds.
+
+    `client` only needs generate_content(contents), so a local fake
+    model works the same as a genai.GenerativeModel created with
+    tools=gemini_tools().
+    """
+    contents = [{"role": "user", "parts": [prompt]}]
+    cache = {}
+
+    for round_number in range(MAX_TOOL_ROUNDS):
+        response = client.generate_content(contents)
+        if round_number == 0 and on_first_response is not None:
+            on_first_response()
+        calls = _function_calls(response)
+        if not calls:
+            return _text(response)
+
+        results = execute_calls(calls, cache)
+        contents.append(response.candidates[0].content)
+        contents.append({
+            "role": "user",
+            "parts": [
+                {"function_response": {"name": name, "response": {"result": result}}}
+                for (name, _), result in zip(calls, results)
+            ],
+        })
+
+    # Out of rounds: ask for an answer from what it has so far
+    return _text(client.generate_content(contents))
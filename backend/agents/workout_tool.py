@@ -1,4 +1,16 @@
-def suggest_workout(goal: str, experience: str):
+from typing import Literal
+
+# Average time under tension per rep, used for duration estimates
+SECONDS_PER_REP = 3
+
+
+def suggest_workout(
+    goal: Literal[
+        "weight loss", "muscle gain", "general fitness", "strength training", "endurance",
+        "home workout", "crossfit", "bodybuilding", "flexibility", "rehab_friendly",
+    ],
+    experience: Literal["beginner", "intermediate", "advanced"],
+) -> str:
     """
     Provide workout suggestions based on user goal and level.
     """
@@ -179,11 +191,11 @@ def suggest_workout(goal: str, experience: str):
     return plans[goal].get(experience, "Unknown experience level.")
 
 
-def workout_duration_calculator(sets, reps, rest_sec):
+def workout_duration_calculator(sets: int, reps: int, rest_sec: int) -> float:
     """
     Estimate total workout duration in minutes.
     """
-    total_reps_time = sets * reps * 3  # assume average 3 seconds per rep
+    total_reps_time = sets * reps * SECONDS_PER_REP
     total_rest_time = (sets - 1) * rest_sec
 
     return round((total_reps_time + total_rest_time) / 60, 2)
@@ -1,12 +1,22 @@
-from fastapi import FastAPI
+import asyncio
+from typing import List, Optional
+
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.responses import FileResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from starlette.concurrency import iterate_in_threadpool
+import json
 import os
 from backend.user_memory import reset_profile   
 
-from .chat_logic import generate_response
+from .chat_logic import generate_response, generate_response_stream
+from .sessions import get_session, touch_session
+from . import debug, metrics_store, model_router, workout_log
+
+# Seconds of silence before the server pings an idle WebSocket
+HEARTBEAT_INTERVAL_SEC = 25
 
 app = FastAPI(title="Fitness AI Assistant")
  
@@ -19,12 +29,39 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Profiling / memory hooks, only when DEBUG_TOKEN is set
+debug.install(app)
+
 # Serve frontend
 FRONTEND_DIR = os.path.join(os.path.dirname(__file__), "..", "frontend")
 app.mount("/static", StaticFiles(directory=FRONTEND_DIR), name="static")
 
 class ChatRequest(BaseModel):
     message: str   # ONLY message, no history
+    session_id: Optional[str] = None
+
+
+class MeasurementRequest(BaseModel):
+    user_id: Optional[str] = None
+    timestamp: Optional[float] = Field(default=None, gt=0)   # epoch seconds, defaults to now
+    weight: Optional[float] = Field(default=None, gt=0, le=metrics_store.LIMITS["weight"][1])       # kg
+    height: Optional[float] = Field(default=None, gt=0, le=metrics_store.LIMITS["height"][1])       # cm
+    body_fat: Optional[float] = Field(default=None, gt=0, le=metrics_store.LIMITS["body_fat"][1])   # %
+    waist: Optional[float] = Field(default=None, gt=0, le=metrics_store.LIMITS["waist"][1])         # cm
+
+
+class WorkoutEntry(BaseModel):
+    exercise: str = Field(min_length=1)
+    sets: int = Field(ge=1, le=workout_log.MAX_SETS)
+    reps: int = Field(ge=1, le=workout_log.MAX_REPS)
+    weight: float = Field(default=0, ge=0, le=workout_log.MAX_WEIGHT_KG)   # kg, 0 for bodyweight
+    rest_sec: float = Field(default=60, ge=0, le=workout_log.MAX_REST_SEC)
+
+
+class WorkoutSessionRequest(BaseModel):
+    user_id: Optional[str] = None
+    timestamp: Optional[float] = Field(default=None, gt=0)   # epoch seconds, defaults to now
+    exercises: List[WorkoutEntry]
 
 @app.on_event("startup")
 def startup_event():
@@ -35,8 +72,133 @@ def startup_event():
 
 @app.post("/chat")
 def chat_endpoint(req: ChatRequest):
-    reply = generate_response(req.message)
-    return {"response": reply}
+    session = get_session(req.session_id)
+    touch_session(session)
+    reply = generate_response(req.message, session["id"])
+    return {"response": reply, "session_id": session["id"]}
+
+
+@app.websocket("/ws/chat")
+async def chat_websocket(websocket: WebSocket):
+    """
+    One persistent connection per browser session.
+
+    client → {"type": "message", "message": "..."} | {"type": "pong"}
+    server → {"type": "session", "session_id": "..."}
+             {"type": "chunk", "text": "..."} ... {"type": "done", "response": "..."}
+             {"type": "ping"} | {"type": "error", "message": "..."}
+    """
+    await websocket.accept()
+    session = get_session(websocket.query_params.get("session_id"))
+    await websocket.send_json({"type": "session", "session_id": session["id"]})
+
+    try:
+        while True:
+            # Idle connections just wait here; ping them so proxies keep them open
+            try:
+                raw = await asyncio.wait_for(websocket.receive_text(), HEARTBEAT_INTERVAL_SEC)
+            except asyncio.TimeoutError:
+                await websocket.send_json({"type": "ping"})
+                continue
+
+            try:
+                data = json.loads(raw)
+            except ValueError:
+                await websocket.send_json({"type": "error", "message": "Invalid JSON."})
+                continue
+
+            if not isinstance(data, dict) or data.get("type") != "message":
+                continue
+
+            message = str(data.get("message", "")).strip()
+            if not message:
+                await websocket.send_json({"type": "error", "message": "Empty message."})
+                continue
+
+            touch_session(session)
+
+            # Gemini calls block, so the generator runs in the threadpool.
+            # A failed turn gets an error frame; the connection stays open.
+            parts = []
+            try:
+                async for chunk in iterate_in_threadpool(generate_response_stream(message, session["id"])):
+                    parts.append(chunk)
+                    await websocket.send_json({"type": "chunk", "text": chunk})
+            except WebSocketDisconnect:
+                raise
+            except Exception as e:
+                print("Chat error →", e)
+                await websocket.send_json({"type": "error", "message": "Sorry, I couldn't process your request."})
+                continue
+            await websocket.send_json({"type": "done", "response": "".join(parts)})
+
+    except WebSocketDisconnect:
+        pass
+
+@app.post("/progress/measurements")
+def add_measurement(req: MeasurementRequest):
+    values = req.model_dump(exclude={"user_id", "timestamp"}, exclude_none=True)
+    if not values:
+        raise HTTPException(status_code=400, detail="No measurements given")
+    try:
+        rows = metrics_store.append(req.user_id, req.timestamp, **values)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"rows": rows}
+
+
+@app.get("/progress/chart")
+def progress_chart(
+    user_id: Optional[str] = None,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    resolution: str = "auto",
+    max_points: int = 200,
+):
+    """
+    Chart-ready series for a time range: weekly means or at most
+    max_points time buckets, plus rolling BMI over the same points.
+    """
+    if resolution == "weekly":
+        series = metrics_store.weekly_averages(user_id, start, end)
+    else:
+        series = metrics_store.chart_series(user_id, start, end, max(1, max_points))
+
+    bmi = metrics_store.rolling_bmi(series)
+    latest = bmi.pop("latest")
+
+    return {
+        "series": metrics_store.to_json(series),
+        "bmi": metrics_store.to_json(bmi),
+        "latest_bmi": latest,
+    }
+
+
+@app.post("/workouts/sessions")
+def add_workout_session(req: WorkoutSessionRequest):
+    try:
+        entries = workout_log.log_session(
+            req.user_id, [e.model_dump() for e in req.exercises], req.timestamp
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"entries": entries}
+
+
+@app.get("/workouts/analytics")
+def workout_analytics(
+    user_id: Optional[str] = None,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    exercise: Optional[str] = None,
+):
+    return workout_log.analytics(user_id, start, end, exercise)
+
+
+@app.get("/metrics")
+def metrics_endpoint():
+    return {"model_routing": model_router.metrics()}
+
 
 @app.get("/")
 def root():
@@ -1,6 +1,23 @@
+import re
+import time
+
 import google.generativeai as genai
-from .config import GEMINI_MODEL_NAME
-from backend.user_memory import get_profile, update_profile, missing_fields
+from .config import GEMINI_MODEL_NAME, KB_CONFIDENCE_THRESHOLD, PRECOMPUTE_WAIT_SEC
+from backend.user_memory import get_profile, update_profile_fields, missing_fields
+from backend.utils.text_cleaner import extract_profile_fields
+from backend.knowledge_base import get_knowledge_base, learn
+from backend import model_router, precompute
+from backend.sessions import find_session
+from backend.agents import calculate_bmi, calculate_daily_calories, suggest_workout
+from backend.agents.calorie_tools import PLAN_TABLE
+from backend.agents.tool_registry import gemini_tools, needs_tools, run_with_tools
+from backend.agents.fitness_tools import (
+    calculate_body_fat,
+    calculate_ideal_weight,
+    calculate_macros,
+    calculate_protein_needs,
+    calculate_water_intake,
+)
 
 # ----------------------------
 #   SYSTEM PROMPT (Improved)
@@ -33,59 +50,308 @@ BEHAVIOR:
 """
 
 # ----------------------------
-#   Gemini Client (Flash Lite)
+#   Gemini Client
 # ----------------------------
-def get_client():
+def get_client(model_name: str = GEMINI_MODEL_NAME, tools=None):
     """
-    Always uses gemini-2.0-flash-lite (free unlimited).
+    Model comes from model_router: a lite model for quick chat,
+    a stronger one for plans and long answers.
     """
     try:
-        return genai.GenerativeModel(GEMINI_MODEL_NAME)
+        return genai.GenerativeModel(model_name, tools=tools)
     except Exception as e:
         print("Client init error →", e)
         return None
 
 
+# ----------------------------
+#   Plan Builders (precomputed)
+# ----------------------------
+def _number(value, default: float) -> float:
+    match = re.search(r"\d+(?:\.\d+)?", str(value or ""))
+    return float(match.group()) if match else default
+
+
+def _workout_goal(profile: dict) -> str:
+    goal = str(profile.get("goal", "")).lower()
+    if "los" in goal or "lean" in goal or "cut" in goal:
+        return "weight loss"
+    if "muscle" in goal or "gain" in goal or "bulk" in goal:
+        return "muscle gain"
+    if "strength" in goal or "strong" in goal:
+        return "strength training"
+    if "endurance" in goal or "run" in goal:
+        return "endurance"
+    return "general fitness"
+
+
+def _macro_goal(profile: dict) -> str:
+    return {"weight loss": "weight_loss", "muscle gain": "muscle_gain"}.get(
+        _workout_goal(profile), "maintain"
+    )
+
+
+def _level(profile: dict) -> str:
+    level = str(profile.get("level", "")).lower()
+    for name in ("beginner", "intermediate", "advanced"):
+        if name in level:
+            return name
+    return "beginner"
+
+
+def _activity(profile: dict) -> str:
+    days = _number(profile.get("training_days"), 3)
+    if days <= 2:
+        return "low"
+    if days <= 4:
+        return "medium"
+    return "high"
+
+
+def ask_gemini(prompt: str, cancelled=None):
+    """
+    One Gemini call, collected into a single string. Returns None on
+    failure or if the work was cancelled before the call went out.
+    """
+    if cancelled is not None and cancelled.is_set():
+        return None
+
+    model = model_router.choose_model(prompt, long_output=True)
+    started = time.perf_counter()
+    first_chunk = None
+    try:
+        client = get_client(model)
+        if client is None:
+            return None
+
+        # Streamed so the router sees time to first chunk, not plan length
+        parts = []
+        for chunk in client.generate_content(f"{SYSTEM_PROMPT}\n\n{prompt}", stream=True):
+            if first_chunk is None:
+                first_chunk = time.perf_counter()
+            parts.append(chunk.text if hasattr(chunk, "text") else str(chunk))
+        model_router.record_call(model, started, ok=True, first_chunk=first_chunk)
+        return "".join(parts)
+    except Exception as e:
+        model_router.record_call(model, started, ok=False, first_chunk=first_chunk)
+        print("Gemini error →", e)
+        return None
+
+
+def build_workout_plan(profile: dict, cancelled=None) -> str:
+    goal, level = _workout_goal(profile), _level(profile)
+    template = suggest_workout(goal, level)
+
+    text = ask_gemini(
+        "Write a concise weekly workout plan for this user.\n"
+        f"USER PROFILE: {profile}\n"
+        f"Base it on this {level} {goal} template:\n{template}",
+        cancelled,
+    )
+    return text or f"**Workout Plan for {goal.title()} ({level.title()})**\n\n{template}"
+
+
+def build_nutrition_plan(profile: dict, cancelled=None) -> str:
+    calories = calculate_daily_calories(
+        _number(profile.get("weight"), 70),
+        _number(profile.get("height"), 175),
+        _number(profile.get("age"), 30),
+        str(profile.get("gender", "")),
+        _activity(profile),
+    )
+    macros = calculate_macros(calories, _macro_goal(profile))
+    summary = (
+        f"**Daily Calories: {calories}**\n"
+        f"Protein: {macros['protein']['grams']} g • "
+        f"Carbs: {macros['carbs']['grams']} g • "
+        f"Fat: {macros['fat']['grams']} g"
+    )
+
+    text = ask_gemini(
+        "Write a concise one-day sample meal plan for this user.\n"
+        f"USER PROFILE: {profile}\n"
+        f"Targets: {summary}",
+        cancelled,
+    )
+    meals = text or "\n".join(f"• {meal}" for meal in PLAN_TABLE.values())
+    return f"{summary}\n\n{meals}"
+
+
+def build_metrics_summary(profile: dict, cancelled=None) -> str:
+    weight = _number(profile.get("weight"), 70)
+    height = _number(profile.get("height"), 175)
+    age = int(_number(profile.get("age"), 30))
+    gender = str(profile.get("gender", ""))
+
+    bmi = calculate_bmi(weight, height)
+    body_fat = calculate_body_fat(weight, height, age, gender)
+    ideal = calculate_ideal_weight(height, gender)
+    protein = calculate_protein_needs(weight, "active" if _activity(profile) == "high" else "moderate")
+    water = calculate_water_intake(weight)
+
+    return (
+        "**Your Metrics**\n"
+        f"• BMI: {bmi['bmi_value']} ({bmi['category']})\n"
+        f"• Body fat: ~{body_fat['body_fat']}% ({body_fat['category']})\n"
+        f"• Ideal weight: {ideal['min']}–{ideal['max']} kg\n"
+        f"• Protein: {protein['protein_grams']} g/day\n"
+        f"• Water: {water['liters']} L/day"
+    )
+
+
+PLAN_BUILDERS = {
+    "metrics": build_metrics_summary,
+    "workout": build_workout_plan,
+    "nutrition": build_nutrition_plan,
+}
+
+
+_QUESTION_WORDS = {
+    "how", "what", "why", "when", "which", "who", "can", "could", "should",
+    "is", "are", "do", "does", "will", "would",
+}
+
+
+def is_question(user_message: str) -> bool:
+    """
+    Questions that mention numbers ("protein for 70 kg?") are not profile answers.
+    """
+    words = user_message.strip().lower().split()
+    return "?" in user_message or (bool(words) and words[0] in _QUESTION_WORDS)
+
+
+# Longer replies to "workout, nutrition, or both?" are treated as new messages
+_MAX_PLAN_CHOICE_WORDS = 8
+_PLAN_PROMPT = "Would you like a workout plan, nutrition plan, or both?"
+
+
+def plan_choice(user_message: str) -> list:
+    """
+    Which plans a short reply to the plan prompt asks for
+    ("both", "the workout one"). Questions choose nothing.
+    """
+    words = set(re.findall(r"[a-z]+", user_message.lower()))
+    if is_question(user_message) or not words or len(user_message.split()) > _MAX_PLAN_CHOICE_WORDS:
+        return []
+
+    if words & {"both", "all", "everything"}:
+        return ["metrics", "workout", "nutrition"]
+
+    chosen = []
+    if words & {"workout", "workouts", "training", "exercise", "exercises"}:
+        chosen.append("workout")
+    if words & {"nutrition", "diet", "meal", "meals", "food"}:
+        chosen.append("nutrition")
+    return chosen
+
+
+def serve_plans(names: list, profile: dict, session_id: str = None) -> str:
+    """
+    Use precomputed results that are done or already running; build
+    anything else now instead of waiting behind queued work.
+    """
+    parts = []
+    for name in names:
+        result = precompute.get_result(session_id, name, profile, timeout=PRECOMPUTE_WAIT_SEC)
+        parts.append(result or PLAN_BUILDERS[name](profile))
+    return "\n\n".join(parts)
+
+
 # ----------------------------
 #   Main Response Generator
 # ----------------------------
-def generate_response(user_message: str) -> str:
+GEMINI_ERROR_REPLY = "I’m having trouble reaching Gemini right now — please try again later."
+
+
+def generate_response(user_message: str, session_id: str = None) -> str:
+    return "".join(generate_response_stream(user_message, session_id))
+
+
+def generate_response_stream(user_message: str, session_id: str = None):
+    """
+    Yield the reply in chunks. Local answers come as a single chunk,
+    Gemini answers are streamed as they are generated.
+    """
     profile = get_profile()
 
+    # Per-connection state; callers without a session get a throwaway dict
+    session = find_session(session_id) or {}
+
+    # Field the previous reply asked for, if any; only valid for this message
+    asked = session.pop("expected_field", None)
+
+    # --------------------------------------
+    # 0) Reply to the plan prompt with a complete profile
+    # --------------------------------------
+    if session.pop("awaiting_plan_choice", False):
+        chosen = plan_choice(user_message)
+        if chosen and profile and not missing_fields(profile):
+            yield serve_plans(chosen, profile, session_id)
+            return
+
     # --------------------------------------
     # 1) User explicitly wants a profile
     # --------------------------------------
     if "profile" in user_message.lower() or "plan" in user_message.lower():
         missing = missing_fields(profile)
         if missing:
-            return (
+            session["expected_field"] = missing[0]
+            yield (
                 "I can create a personalized plan for you.\n"
                 f"Missing fields: {', '.join(missing)}.\n"
                 "Please provide one detail at a time."
             )
         else:
-            return (
-                "Your fitness profile is complete! 🎉\n"
-                "Do you want a workout plan, nutrition plan, or both?"
-            )
+            precompute.schedule(session_id, profile, PLAN_BUILDERS)
+            session["awaiting_plan_choice"] = True
+            yield f"Your fitness profile is complete! 🎉\n{_PLAN_PROMPT}"
+        return
 
     # --------------------------------------
     # 2) User may be giving profile data
     # --------------------------------------
-    if any(token.isdigit() for token in user_message.split()):
-        update_profile(user_message)
-        missing = missing_fields(get_profile())
+    fields = {}
+    if not is_question(user_message):
+        fields = extract_profile_fields(user_message, expected=asked)
+
+    if fields:
+        update_profile_fields(fields)
+        profile = get_profile()
+        missing = missing_fields(profile)
         if missing:
-            return f"Great — I saved that. I still need: {', '.join(missing)}."
-        return "Your profile is now complete! Would you like a workout plan, nutrition plan, or both?"
+            session["expected_field"] = missing[0]
+            saved = ", ".join(f"{key}: {value}" for key, value in fields.items())
+            yield (
+                f"Great — I saved {saved}. I still need: {', '.join(missing)}.\n"
+                f"What is your {missing[0].replace('_', ' ')}?"
+            )
+        else:
+            # Start the likely next answers while the user reads this one
+            precompute.schedule(session_id, profile, PLAN_BUILDERS)
+            session["awaiting_plan_choice"] = True
+            yield f"Your profile is now complete! {_PLAN_PROMPT}"
+        return
 
     # --------------------------------------
-    # 3) Default → Ask Gemini with system prompt
+    # 3) Common FAQ → answer from local knowledge base
     # --------------------------------------
+    local_answer = get_knowledge_base().answer(user_message, KB_CONFIDENCE_THRESHOLD)
+    if local_answer:
+        yield local_answer
+        return
+
+    # --------------------------------------
+    # 4) Default → Ask Gemini with system prompt
+    # --------------------------------------
+    model = model_router.choose_model(user_message)
+    use_tools = needs_tools(user_message)
+    started = time.perf_counter()
+    first_chunk = None
     try:
-        client = get_client()
+        client = get_client(model, tools=gemini_tools() if use_tools else None)
         if client is None:
-            return "I’m having trouble reaching Gemini right now — please try again later."
+            yield GEMINI_ERROR_REPLY
+            return
 
         prompt = f"""
         SYSTEM INSTRUCTIONS:
@@ -100,9 +366,32 @@ def generate_response(user_message: str) -> str:
         Respond as GymAI.
                 """
 
-        reply = client.generate_content(prompt)
-        return reply.text if hasattr(reply, "text") else str(reply)
+        # Calculations run locally through function calls instead of
+        # being worked out in free text. Only the first model call is
+        # timed, like a streamed first chunk; tool rounds are not.
+        # An empty answer is not a model error.
+        if use_tools:
+            first_response = []
+            text = run_with_tools(client, prompt, lambda: first_response.append(time.perf_counter()))
+            model_router.record_call(model, started, ok=True, first_chunk=first_response[0])
+            yield text or GEMINI_ERROR_REPLY
+            return
+
+        parts = []
+        for chunk in client.generate_content(prompt, stream=True):
+            text = chunk.text if hasattr(chunk, "text") else str(chunk)
+            if text:
+                if first_chunk is None:
+                    first_chunk = time.perf_counter()
+                parts.append(text)
+                yield text
+        model_router.record_call(model, started, ok=True, first_chunk=first_chunk)
+
+        # Profile-free replies are generic, so they can be reused
+        if not profile:
+            learn(user_message, "".join(parts))
 
     except Exception as e:
+        model_router.record_call(model, started, ok=False, first_chunk=first_chunk)
         print("Gemini error →", e)
-        return "I’m having trouble reaching Gemini right now — please try again later."
+        yield GEMINI_ERROR_REPLY
@@ -10,6 +10,20 @@ GOOGLE_GEMINI_API_KEY = os.getenv("GOOGLE_GEMINI_API_KEY")
 # free model
 GEMINI_MODEL_NAME = "gemini-flash-latest"
 
+# Model router tiers: quick chat vs. plans and long answers
+GEMINI_FAST_MODEL = os.getenv("GEMINI_FAST_MODEL", "gemini-flash-lite-latest")
+GEMINI_STRONG_MODEL = os.getenv("GEMINI_STRONG_MODEL", GEMINI_MODEL_NAME)
+
+# Minimum BM25 confidence (0-1) to answer a FAQ locally instead of calling Gemini
+KB_CONFIDENCE_THRESHOLD = float(os.getenv("KB_CONFIDENCE_THRESHOLD", "0.6"))
+
+# Max seconds to wait for a precomputed plan that is still being generated
+PRECOMPUTE_WAIT_SEC = float(os.getenv("PRECOMPUTE_WAIT_SEC", "30"))
+
+# Debug endpoints (/debug/*) are only mounted when a token is set
+DEBUG_TOKEN = os.getenv("DEBUG_TOKEN")
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "1000"))
+
 
 # Configure Gemini
 genai.configure(api_key=GOOGLE_GEMINI_API_KEY)
@@ -0,0 +1,298 @@
+import contextvars
+import functools
+import hmac
+import inspect
+import itertools
+import os
+import sys
+import threading
+import time
+import traceback
+import tracemalloc
+from collections import Counter, deque
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from fastapi.routing import APIRoute
+
+from .config import DEBUG_TOKEN, SLOW_REQUEST_MS
+
+
+MAX_PROFILE_SECONDS = 60
+MAX_SLOW_PER_ENDPOINT = 20
+
+
+def require_token(x_debug_token: str = Header(default="")):
+    # Compare bytes: compare_digest raises TypeError on non-ASCII str
+    if not DEBUG_TOKEN or not hmac.compare_digest(x_debug_token.encode(), DEBUG_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+
+# Opt-in debug surface: mounted only when DEBUG_TOKEN is set, so a normal
+# server pays nothing. Every route needs the token in X-Debug-Token.
+router = APIRouter(prefix="/debug", dependencies=[Depends(require_token)])
+
+
+def _frame_names(frame) -> list:
+    """
+    Stack of "file:function" names for a frame, outermost first.
+    """
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    names.reverse()
+    return names
+
+
+# ----------------------------
+#   Sampling CPU Profiler
+# ----------------------------
+def sample_stacks(seconds: float, interval: float = 0.005) -> Counter:
+    """
+    Sample every other thread's stack for `seconds` and count
+    collapsed stacks ("a;b;c"), the input format of flamegraph.pl.
+    """
+    me = threading.get_ident()
+    counts = Counter()
+    deadline = time.perf_counter() + seconds
+
+    while time.perf_counter() < deadline:
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id != me:
+                counts[";".join(_frame_names(frame))] += 1
+        time.sleep(interval)
+
+    return counts
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+def profile_cpu(seconds: float = 5, interval_ms: float = 5):
+    """
+    Collapsed stacks, one "stack count" line each, hottest first.
+    """
+    seconds = max(0.1, min(seconds, MAX_PROFILE_SECONDS))
+    counts = sample_stacks(seconds, max(1, interval_ms) / 1000)
+    return "\n".join(f"{stack} {n}" for stack, n in counts.most_common())
+
+
+# ----------------------------
+#   tracemalloc Snapshots
+# ----------------------------
+_last_snapshot = None
+
+
+def _top_stats(stats, limit: int) -> list:
+    return [
+        {
+            "location": str(stat.traceback),
+            "size_kb": round(stat.size / 1024, 1),
+            "size_diff_kb": round(getattr(stat, "size_diff", 0) / 1024, 1),
+            "count": stat.count,
+        }
+        for stat in stats[:limit]
+    ]
+
+
+@router.post("/memory/start")
+def memory_start(frames: int = 1):
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(max(1, frames))
+    return {"tracing": True}
+
+
+@router.post("/memory/stop")
+def memory_stop():
+    global _last_snapshot
+    tracemalloc.stop()
+    _last_snapshot = None
+    return {"tracing": False}
+
+
+@router.get("/memory/snapshot")
+def memory_snapshot(limit: int = 20, diff: bool = False):
+    """
+    Top allocators by line. With diff=true, compare against the previous
+    snapshot taken through this endpoint.
+    """
+    global _last_snapshot
+    if not tracemalloc.is_tracing():
+        raise HTTPException(status_code=409, detail="tracemalloc is not running")
+
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+
+    if diff and _last_snapshot is not None:
+        stats = snapshot.compare_to(_last_snapshot, "lineno")
+    else:
+        stats = snapshot.statistics("lineno")
+    _last_snapshot = snapshot
+
+    current, peak = tracemalloc.get_traced_memory()
+    return {
+        "current_kb": round(current / 1024, 1),
+        "peak_kb": round(peak / 1024, 1),
+        "top": _top_stats(stats, limit),
+    }
+
+
+# ----------------------------
+#   Slow Request Capture
+# ----------------------------
+_in_flight = {}
+_slow_requests = {}
+_request_ids = itertools.count()
+_watchdog_lock = threading.Lock()
+_watchdog_started = False
+
+# Record of the HTTP request being handled; copied into threadpool workers
+_current_record = contextvars.ContextVar("debug_request_record", default=None)
+
+
+def _track(endpoint):
+    """
+    Wrap an endpoint so the request's record knows which thread runs it
+    and which code object to look for in that thread's stack.
+    """
+    def enter():
+        record = _current_record.get()
+        if record is not None:
+            record["thread"] = threading.get_ident()
+            record["code"] = endpoint.__code__
+        return record
+
+    def leave(record):
+        if record is not None:
+            record["thread"] = None
+
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def tracked(*args, **kwargs):
+            record = enter()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                leave(record)
+    else:
+        @functools.wraps(endpoint)
+        def tracked(*args, **kwargs):
+            record = enter()
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                leave(record)
+    return tracked
+
+
+class TrackedRoute(APIRoute):
+    """
+    APIRoute whose endpoint reports its thread to SlowRequestMiddleware.
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, _track(endpoint), **kwargs)
+
+
+def _capture_stack(record: dict) -> list:
+    """
+    Stack of the thread running this request's endpoint, if it is on
+    a thread right now (an async endpoint may be suspended).
+    """
+    thread_id, code = record.get("thread"), record.get("code")
+    frame = sys._current_frames().get(thread_id) if thread_id else None
+
+    current = frame
+    while current is not None and current.f_code is not code:
+        current = current.f_back
+    if current is None:
+        return []
+    return ["".join(traceback.format_list(traceback.extract_stack(frame)))]
+
+
+def _watchdog(threshold: float):
+    """
+    Single background thread: grab the stack of each request that passes the threshold.
+    """
+    while True:
+        time.sleep(max(0.01, threshold / 4))
+        now = time.perf_counter()
+        for record in list(_in_flight.values()):
+            if record["stacks"] is None and now - record["start"] >= threshold:
+                record["stacks"] = _capture_stack(record)
+
+
+class SlowRequestMiddleware:
+    """
+    Record method, path, duration and the mid-request stack of every
+    HTTP request slower than threshold_ms, grouped by endpoint.
+    """
+
+    def __init__(self, app, threshold_ms: float = SLOW_REQUEST_MS):
+        self.app = app
+        self.threshold = threshold_ms / 1000
+
+    def _start_watchdog(self):
+        global _watchdog_started
+        with _watchdog_lock:
+            if not _watchdog_started:
+                threading.Thread(target=_watchdog, args=(self.threshold,), daemon=True).start()
+                _watchdog_started = True
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith("/debug"):
+            await self.app(scope, receive, send)
+            return
+
+        self._start_watchdog()
+        request_id = next(_request_ids)
+        record = {
+            "method": scope["method"],
+            "path": scope["path"],
+            "start": time.perf_counter(),
+            "stacks": None,
+            "thread": None,
+            "code": None,
+        }
+        _in_flight[request_id] = record
+        token = _current_record.set(record)
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_record.reset(token)
+            del _in_flight[request_id]
+            elapsed = time.perf_counter() - record["start"]
+            if elapsed >= self.threshold:
+                key = f"{record['method']} {record['path']}"
+                _slow_requests.setdefault(key, deque(maxlen=MAX_SLOW_PER_ENDPOINT)).append({
+                    "at": time.time(),
+                    "duration_ms": round(elapsed * 1000, 1),
+                    "stacks": record["stacks"] or [],
+                })
+
+
+@router.get("/slow-requests")
+def slow_requests():
+    return {key: list(records) for key, records in _slow_requests.items()}
+
+
+@router.delete("/slow-requests")
+def clear_slow_requests():
+    _slow_requests.clear()
+    return {"cleared": True}
+
+
+def install(app):
+    """
+    Mount the debug routes and slow-request capture, only if DEBUG_TOKEN
+    is set. Call it before defining routes, so they use TrackedRoute.
+    """
+    if not DEBUG_TOKEN:
+        return False
+    app.router.route_class = TrackedRoute
+    app.include_router(router)
+    app.add_middleware(SlowRequestMiddleware, threshold_ms=SLOW_REQUEST_MS)
+    return True
@@ -0,0 +1,275 @@
+import csv
+import math
+import os
+import re
+from collections import Counter
+
+EXAMPLES_FILE = os.path.join(os.path.dirname(__file__), "prompts", "examples.txt")
+LOGS_FILE = os.path.join(os.path.dirname(__file__), "..", "data", "logs.csv")
+
+# Default confidence a match needs before it is answered locally
+DEFAULT_THRESHOLD = 0.6
+
+# Shorter queries ("hello", "workout") match too loosely to answer locally
+MIN_QUERY_TERMS = 2
+
+# Stop adding Gemini replies to the live index after this many
+MAX_LEARNED = 200
+
+_TOKEN_RE = re.compile(r"[a-z]+")
+
+STOPWORDS = {
+    "a", "an", "the", "i", "me", "my", "you", "your", "is", "are", "am",
+    "do", "does", "can", "could", "should", "would", "to", "of", "for",
+    "in", "on", "and", "or", "it", "be", "what", "how", "please", "with",
+    "that", "this", "at", "per", "much", "many", "some", "any", "get",
+    "which", "where", "when", "who", "one", "there", "here", "about",
+    "tell", "want", "need", "im", "s",
+}
+
+# Tool commands are answered by calculators, never from the knowledge base
+_COMMAND_PREFIXES = (
+    "bmi", "calories", "meal calories", "workout", "duration", "bodyfat",
+    "idealweight", "protein", "water", "heartrate", "macros",
+)
+
+# Reusable answers are about these topics (tokens after tokenize())
+FITNESS_TERMS = {
+    "workout", "exercise", "training", "train", "gym", "fitness", "fit",
+    "muscle", "strength", "cardio", "endurance", "weight", "fat", "lean",
+    "bulk", "cut", "tone", "protein", "calorie", "diet", "nutrition", "meal",
+    "eat", "eating", "food", "carb", "macro", "bmi", "water", "hydration",
+    "supplement", "creatine", "rest", "recovery", "sleep", "stretch",
+    "stretching", "warm", "injury", "pain", "sore", "squat", "deadlift",
+    "bench", "rep", "set", "lift", "lifting", "run", "running", "abs",
+    "core", "routine", "overload", "beginner", "body",
+}
+
+_QUESTION_WORDS = {
+    "how", "what", "why", "when", "which", "who", "can", "could", "should",
+    "is", "are", "do", "does", "will", "would",
+}
+
+_GREETINGS = {"hi", "hello", "hey", "yo", "thanks", "thank"}
+
+# Answers that depend on the day they were given
+_TIME_WORDS = {"today", "tonight", "tomorrow", "yesterday", "latest", "currently", "news", "recent", "recently"}
+
+# Requests for personal output ("make me a workout") are not FAQ questions
+_REQUEST_RE = re.compile(r"\b(make|give|create|build|generate|write|design|send)\b.*\bme\b")
+
+# Replies that must never be replayed from the knowledge base
+_BAD_REPLY_PREFIXES = (
+    "error",
+    "i’m having trouble",
+    "i'm having trouble",
+)
+
+
+def tokenize(text: str) -> list:
+    """
+    Lowercase, split into words, drop stopwords and strip plural "s".
+    """
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+# ----------------------------
+#   BM25 Inverted Index
+# ----------------------------
+class KnowledgeBase:
+    """
+    Small in-memory BM25 index over question/answer pairs.
+
+    Only questions are indexed, so a user message is matched against
+    questions that were already answered well. Entries can be added at
+    any time; statistics are updated incrementally.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.questions = []
+        self.answers = []
+        self.doc_lengths = []
+        self.total_length = 0
+        # term -> {doc_id: term frequency}
+        self.postings = {}
+        self._seen = set()
+
+    def __len__(self):
+        return len(self.questions)
+
+    def add(self, question: str, answer: str):
+        """
+        Index one Q&A pair. Returns the doc id, or None for duplicates
+        and questions with no searchable words.
+        """
+        tokens = tokenize(question)
+        key = " ".join(tokens)
+        if not tokens or key in self._seen:
+            return None
+
+        doc_id = len(self.questions)
+        self._seen.add(key)
+        self.questions.append(question.strip())
+        self.answers.append(answer.strip())
+        self.doc_lengths.append(len(tokens))
+        self.total_length += len(tokens)
+
+        for term, tf in Counter(tokens).items():
+            self.postings.setdefault(term, {})[doc_id] = tf
+
+        return doc_id
+
+    def idf(self, term: str) -> float:
+        n = len(self.questions)
+        df = len(self.postings.get(term, ()))
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, top_k: int = 3) -> list:
+        """
+        Return up to top_k (confidence, doc_id) tuples, best first.
+
+        Confidence is the BM25 score divided by the sum of the query
+        terms' idf, clamped to 1.0. Query words the index has never seen
+        still count towards that sum, so unfamiliar questions score low.
+        """
+        terms = set(tokenize(query))
+        if not terms or not self.questions:
+            return []
+
+        avg_len = self.total_length / len(self.questions)
+        scores = {}
+        ideal = 0.0
+
+        for term in terms:
+            idf = self.idf(term)
+            ideal += idf
+            for doc_id, tf in self.postings.get(term, {}).items():
+                norm = 1 - self.b + self.b * self.doc_lengths[doc_id] / avg_len
+                score = idf * tf * (self.k1 + 1) / (tf + self.k1 * norm)
+                scores[doc_id] = scores.get(doc_id, 0.0) + score
+
+        if ideal <= 0:
+            return []
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return [(min(1.0, score / ideal), doc_id) for doc_id, score in ranked[:top_k]]
+
+    def answer(self, query: str, threshold: float = DEFAULT_THRESHOLD):
+        """
+        Return the stored answer for the best match, or None when no
+        match reaches the confidence threshold.
+        """
+        if len(set(tokenize(query))) < MIN_QUERY_TERMS:
+            return None
+
+        results = self.search(query, top_k=1)
+        if not results:
+            return None
+
+        confidence, doc_id = results[0]
+        if confidence < threshold:
+            return None
+        return self.answers[doc_id]
+
+
+# ----------------------------
+#   Corpus Loading
+# ----------------------------
+def load_examples(path: str = EXAMPLES_FILE) -> list:
+    """
+    Parse "Q: ... / A: ..." blocks from the examples prompt file.
+    """
+    if not os.path.exists(path):
+        return []
+
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+
+    pairs = []
+    for block in re.split(r"\n\s*\n(?=Q:)", text):
+        match = re.match(r"\s*Q:(.*?)\nA:(.*)", block, re.S)
+        if match:
+            pairs.append((match.group(1).strip(), match.group(2).strip()))
+    return pairs
+
+
+def is_quality_pair(question: str, answer: str) -> bool:
+    """
+    Keep only generic fitness Q&A pairs that are safe to replay: real
+    questions, no greetings, personal requests, numbers, tool commands
+    or time-sensitive wording, and no errors or one-liners.
+    """
+    text = question.strip().lower()
+    words = _TOKEN_RE.findall(text)
+    tokens = set(tokenize(question))
+
+    if not words or words[0] in _GREETINGS:
+        return False
+    if "?" not in text and words[0] not in _QUESTION_WORDS:
+        return False
+    if any(ch.isdigit() for ch in text) or text.startswith(_COMMAND_PREFIXES):
+        return False
+    if _REQUEST_RE.search(text) or tokens & _TIME_WORDS:
+        return False
+    if len(tokens) < MIN_QUERY_TERMS or not tokens & FITNESS_TERMS or len(answer) < 80:
+        return False
+    return not answer.strip().lower().startswith(_BAD_REPLY_PREFIXES)
+
+
+def load_log_pairs(path: str = LOGS_FILE) -> list:
+    """
+    Read past (user input, AI response) pairs from data/logs.csv.
+    """
+    if not os.path.exists(path):
+        return []
+
+    pairs = []
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        for row in csv.reader(f):
+            if len(row) < 3 or row[0] == "Timestamp":
+                continue
+            if is_quality_pair(row[1], row[2]):
+                pairs.append((row[1], row[2]))
+    return pairs
+
+
+def build_knowledge_base() -> KnowledgeBase:
+    """
+    Curated examples first, so they win over log replies to the same question.
+    """
+    kb = KnowledgeBase()
+    for question, answer in load_examples() + load_log_pairs():
+        kb.add(question, answer)
+    return kb
+
+
+_knowledge_base = None
+_learned = 0
+
+
+def get_knowledge_base() -> KnowledgeBase:
+    global _knowledge_base
+    if _knowledge_base is None:
+        _knowledge_base = build_knowledge_base()
+    return _knowledge_base
+
+
+def learn(question: str, answer: str):
+    """
+    Add a fresh Gemini reply to the live index if it passes the quality
+    filter, up to MAX_LEARNED replies per process.
+    """
+    global _learned
+    if _learned >= MAX_LEARNED or not is_quality_pair(question, answer):
+        return
+    if get_knowledge_base().add(question, answer) is not None:
+        _learned += 1
@@ -0,0 +1,174 @@
+import os
+import time
+
+import numpy as np
+
+from backend.agents import calculate_bmi
+from backend.utils.column_store import ColumnStore
+
+STORE_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "metrics")
+
+# One append-only binary file per column; missing values are NaN
+COLUMNS = ("weight", "height", "body_fat", "waist")
+TIME_COLUMN = "timestamp"
+
+# Accepted range per measurement: above the first value, up to the second
+LIMITS = {
+    "weight": (0, 500),      # kg
+    "height": (0, 300),      # cm
+    "body_fat": (0, 100),    # %
+    "waist": (0, 300),       # cm
+}
+
+DEFAULT_USER = "default"
+WEEK_SEC = 7 * 24 * 3600
+
+store = ColumnStore(STORE_DIR, {TIME_COLUMN: np.float64, **{name: np.float32 for name in COLUMNS}})
+
+
+def row_count(user_id: str) -> int:
+    return store.row_count(user_id)
+
+
+# ----------------------------
+#   Append
+# ----------------------------
+def append(user_id: str, timestamp: float = None, **values) -> int:
+    """
+    Append one measurement row. Unknown columns and values outside
+    LIMITS raise ValueError, and timestamps must not go backwards so the
+    time column stays sorted. Returns the new row count.
+    """
+    unknown = set(values) - set(COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown measurement(s): {', '.join(sorted(unknown))}")
+    for column, value in values.items():
+        low, high = LIMITS[column]
+        if value is not None and not low < float(value) <= high:
+            raise ValueError(f"{column} must be above {low} and at most {high}")
+
+    row = {TIME_COLUMN: [time.time() if timestamp is None else float(timestamp)]}
+    for column in COLUMNS:
+        value = values.get(column)
+        row[column] = [np.nan if value is None else float(value)]
+    return store.append(user_id, row)
+
+
+# ----------------------------
+#   Range Queries
+# ----------------------------
+def query_range(user_id: str, start: float = None, end: float = None) -> dict:
+    """
+    All columns for a time range. Only the matching slice is read.
+    """
+    return store.read(user_id, start, end)
+
+
+def _bucketed(user_id: str, start: float, end: float, bucket_of, n_buckets: int) -> dict:
+    """
+    NaN-ignoring means of every column per bucket, accumulated chunk by
+    chunk. `bucket_of(times)` maps timestamps to ids in [0, n_buckets).
+    Empty buckets are dropped.
+    """
+    sums = {column: np.zeros(n_buckets) for column in (TIME_COLUMN,) + COLUMNS}
+    counts = {column: np.zeros(n_buckets) for column in (TIME_COLUMN,) + COLUMNS}
+
+    for chunk in store.iter_chunks(user_id, start, end):
+        ids = bucket_of(chunk[TIME_COLUMN])
+        for column, values in chunk.items():
+            present = ~np.isnan(values)
+            sums[column] += np.bincount(ids, weights=np.where(present, values, 0), minlength=n_buckets)
+            counts[column] += np.bincount(ids, weights=present, minlength=n_buckets)
+
+    used = counts[TIME_COLUMN] > 0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return {column: sums[column][used] / counts[column][used] for column in sums}
+
+
+def _empty_series() -> dict:
+    return {column: np.empty(0) for column in (TIME_COLUMN,) + COLUMNS}
+
+
+def weekly_averages(user_id: str, start: float = None, end: float = None) -> dict:
+    span = store.time_span(user_id, start, end)
+    if span is None:
+        return _empty_series()
+
+    first_week = int(span[0] // WEEK_SEC)
+    n_weeks = int(span[1] // WEEK_SEC) - first_week + 1
+    return _bucketed(
+        user_id, start, end,
+        lambda times: (times // WEEK_SEC).astype(np.int64) - first_week,
+        n_weeks,
+    )
+
+
+def chart_series(user_id: str, start: float = None, end: float = None,
+                 max_points: int = 200) -> dict:
+    """
+    Time-bucketed means so a chart never gets more than max_points points.
+    """
+    span = store.time_span(user_id, start, end)
+    if span is None:
+        return _empty_series()
+
+    rows, lo, hi = store.bounds(user_id, start, end)
+    if hi - lo <= max_points:
+        return query_range(user_id, start, end)
+
+    first, width = span[0], max(span[1] - span[0], 1.0)
+    return _bucketed(
+        user_id, start, end,
+        lambda times: np.minimum(((times - first) / width * max_points).astype(np.int64), max_points - 1),
+        max_points,
+    )
+
+
+def _forward_fill(values: np.ndarray) -> np.ndarray:
+    """
+    Replace each NaN with the last value seen before it.
+    """
+    index = np.where(np.isnan(values), 0, np.arange(len(values)))
+    np.maximum.accumulate(index, out=index)
+    return values[index]
+
+
+def rolling_bmi(series: dict, window: int = 4, default_height: float = None) -> dict:
+    """
+    BMI for each point of a series (raw, weekly or chart buckets) and its
+    rolling mean over `window` points. Height is carried forward from the
+    latest known value.
+    """
+    times = np.asarray(series[TIME_COLUMN], dtype=np.float64)
+    weight = np.asarray(series["weight"], dtype=np.float64)
+    height = _forward_fill(np.asarray(series["height"], dtype=np.float64))
+    if default_height:
+        height = np.where(np.isnan(height), default_height, height)
+
+    keep = ~np.isnan(weight) & ~np.isnan(height) & (height > 0)
+    times, weight, height = times[keep], weight[keep], height[keep]
+
+    bmi = weight / (height / 100.0) ** 2
+    cumsum = np.concatenate(([0.0], np.cumsum(bmi)))
+    ends = np.arange(1, len(bmi) + 1)
+    starts = np.maximum(0, ends - max(1, window))
+    rolling = (cumsum[ends] - cumsum[starts]) / (ends - starts)
+
+    # Category from the shared calculator, for the latest point
+    latest = calculate_bmi(float(weight[-1]), float(height[-1])) if len(bmi) else None
+
+    return {TIME_COLUMN: times, "bmi": bmi, "rolling_bmi": rolling, "latest": latest}
+
+
+def to_json(series: dict) -> dict:
+    """
+    numpy arrays → lists, with NaN and inf as None.
+    """
+    result = {}
+    for key, value in series.items():
+        if isinstance(value, np.ndarray):
+            value = value.astype(np.float64)
+            result[key] = [round(float(v), 2) if np.isfinite(v) else None for v in value]
+        else:
+            result[key] = value
+    return result
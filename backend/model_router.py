@@ -0,0 +1,110 @@
+import re
+import threading
+import time
+from collections import Counter, deque
+
+from .config import GEMINI_FAST_MODEL, GEMINI_STRONG_MODEL
+
+# Rolling window of recent calls kept per model
+WINDOW = 50
+
+# A model is degraded above this error rate or median latency (seconds).
+# Latency is time to the first chunk, so a long plan is not a slow model.
+MAX_ERROR_RATE = 0.3
+MAX_MEDIAN_LATENCY_SEC = 8.0
+
+# Need this many samples before judging a model's health
+MIN_SAMPLES = 5
+
+# Only calls this recent count, so a degraded model gets retried later
+HEALTH_WINDOW_SEC = 300
+
+# Messages that ask for long, structured output go to the stronger model
+_COMPLEX_RE = re.compile(
+    r"\b(plan|program|programme|routine|schedule|split|week|weekly|diet|meal|"
+    r"periodi[sz]ation|explain|compare|why|detailed?)\b",
+    re.I,
+)
+_LONG_MESSAGE_WORDS = 25
+
+_lock = threading.Lock()
+_calls = {GEMINI_FAST_MODEL: deque(maxlen=WINDOW), GEMINI_STRONG_MODEL: deque(maxlen=WINDOW)}
+_decisions = Counter()
+
+
+def classify(user_message: str, long_output: bool = False) -> str:
+    """
+    "strong" for plan generation and long/complex questions, else "fast".
+    """
+    if long_output:
+        return "strong"
+    if len(user_message.split()) > _LONG_MESSAGE_WORDS or _COMPLEX_RE.search(user_message):
+        return "strong"
+    return "fast"
+
+
+def _health(model: str) -> dict:
+    cutoff = time.time() - HEALTH_WINDOW_SEC
+    calls = [(latency, ok) for at, latency, ok in _calls.setdefault(model, deque(maxlen=WINDOW)) if at >= cutoff]
+    if not calls:
+        return {"samples": 0, "error_rate": 0.0, "median_latency": 0.0}
+
+    latencies = sorted(latency for latency, ok in calls if ok)
+    errors = sum(1 for _, ok in calls if not ok)
+    return {
+        "samples": len(calls),
+        "error_rate": round(errors / len(calls), 3),
+        "median_latency": round(latencies[len(latencies) // 2], 3) if latencies else 0.0,
+    }
+
+
+def _degraded(model: str) -> bool:
+    health = _health(model)
+    if health["samples"] < MIN_SAMPLES:
+        return False
+    return (
+        health["error_rate"] > MAX_ERROR_RATE
+        or health["median_latency"] > MAX_MEDIAN_LATENCY_SEC
+    )
+
+
+def choose_model(user_message: str, long_output: bool = False) -> str:
+    """
+    Pick a Gemini model for this request and count the decision.
+    Falls over to the other tier while the preferred one is degraded.
+    """
+    tier = classify(user_message, long_output)
+    preferred, other = (
+        (GEMINI_STRONG_MODEL, GEMINI_FAST_MODEL) if tier == "strong"
+        else (GEMINI_FAST_MODEL, GEMINI_STRONG_MODEL)
+    )
+
+    with _lock:
+        model, reason = preferred, tier
+        if _degraded(preferred) and not _degraded(other):
+            model, reason = other, f"{tier}_failover"
+        _decisions[(model, reason)] += 1
+
+    return model
+
+
+def record_call(model: str, started: float, ok: bool, first_chunk: float = None):
+    """
+    Record one finished call. `started` and `first_chunk` are
+    time.perf_counter() values; without a first chunk (no output, or
+    a non-streamed call) the latency runs until now.
+    """
+    latency = (time.perf_counter() if first_chunk is None else first_chunk) - started
+    with _lock:
+        _calls.setdefault(model, deque(maxlen=WINDOW)).append((time.time(), latency, ok))
+
+
+def metrics() -> dict:
+    with _lock:
+        return {
+            "models": {model: _health(model) for model in _calls},
+            "decisions": [
+                {"model": model, "reason": reason, "count": count}
+                for (model, reason), count in _decisions.most_common()
+            ],
+        }
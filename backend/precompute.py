@@ -0,0 +1,96 @@
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import CancelledError, ThreadPoolExecutor, TimeoutError
+
+# Background workers for speculative work (mostly waiting on Gemini)
+MAX_WORKERS = 4
+
+# Keep result slots for at most this many sessions
+MAX_SLOTS = 256
+
+# Default session key for callers without a session id (plain HTTP clients)
+DEFAULT_SLOT = "default"
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="precompute")
+_slots = OrderedDict()
+_lock = threading.Lock()
+
+
+def profile_key(profile: dict) -> str:
+    return json.dumps(profile, sort_keys=True)
+
+
+def _run(builder, profile: dict, cancelled: threading.Event):
+    if cancelled.is_set():
+        raise CancelledError()
+    return builder(profile, cancelled)
+
+
+def cancel(session_id: str = None):
+    """
+    Cancel any pending work for a session and drop its slot.
+    """
+    with _lock:
+        slot = _slots.pop(session_id or DEFAULT_SLOT, None)
+    if slot:
+        slot["cancelled"].set()
+        for future in slot["futures"].values():
+            future.cancel()
+
+
+def schedule(session_id: str, profile: dict, builders: dict):
+    """
+    Start every builder(profile, cancelled_event) in the background and
+    keep the futures in the session's slot. Replaces (and cancels) an
+    older slot unless it was built for the same profile.
+    """
+    session_id = session_id or DEFAULT_SLOT
+    key = profile_key(profile)
+
+    with _lock:
+        slot = _slots.get(session_id)
+        if slot and slot["profile_key"] == key:
+            _slots.move_to_end(session_id)
+            return
+
+    cancel(session_id)
+
+    cancelled = threading.Event()
+    futures = {
+        name: _executor.submit(_run, builder, dict(profile), cancelled)
+        for name, builder in builders.items()
+    }
+
+    with _lock:
+        _slots[session_id] = {"profile_key": key, "cancelled": cancelled, "futures": futures}
+        while len(_slots) > MAX_SLOTS:
+            _, old = _slots.popitem(last=False)
+            old["cancelled"].set()
+
+
+def get_result(session_id: str, name: str, profile: dict, timeout: float = None):
+    """
+    Return a precomputed result, waiting up to `timeout` seconds if it is
+    still running. None if nothing usable was scheduled for this profile,
+    or if the work has not started yet: it is cancelled, since the caller
+    builds it sooner than the shared pool would.
+    """
+    with _lock:
+        slot = _slots.get(session_id or DEFAULT_SLOT)
+
+    if not slot or slot["profile_key"] != profile_key(profile) or name not in slot["futures"]:
+        return None
+
+    future = slot["futures"][name]
+    # cancel() fails once the work has started; then it is worth waiting for
+    if future.cancel():
+        return None
+
+    try:
+        return future.result(timeout=timeout)
+    except (CancelledError, TimeoutError):
+        return None
+    except Exception as e:
+        print("Precompute error →", e)
+        return None
@@ -0,0 +1,98 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from backend import precompute
+
+# Drop sessions nobody has touched for this long
+SESSION_TTL_SEC = 60 * 60
+
+# Keep at most this many sessions; the least recently used go first
+MAX_SESSIONS = 10000
+
+# Per-connection chat state only (message count, pending questions).
+# The fitness profile is still the single shared user_profile.json.
+_sessions = OrderedDict()
+_lock = threading.Lock()
+
+
+def new_session_id() -> str:
+    return uuid.uuid4().hex
+
+
+def _drop(session_ids: list):
+    # Speculative plans of a dropped session are never served
+    for session_id in session_ids:
+        precompute.cancel(session_id)
+
+
+def get_session(session_id: str = None) -> dict:
+    """
+    Return the state dict for a browser session. Reconnecting with an id
+    this server issued resumes that session; any other id (unknown,
+    expired, made up by the client) gets a new session with a new id.
+    """
+    expire_sessions()
+
+    evicted = []
+    with _lock:
+        session = _sessions.get(session_id) if session_id else None
+        if session is None:
+            session = {
+                "id": new_session_id(),
+                "created": time.time(),
+                "messages": 0,
+            }
+            _sessions[session["id"]] = session
+            while len(_sessions) > MAX_SESSIONS:
+                evicted.append(_sessions.popitem(last=False)[0])
+
+        session["last_seen"] = time.time()
+        _sessions.move_to_end(session["id"])
+
+    _drop(evicted)
+    return session
+
+
+def find_session(session_id: str = None):
+    """
+    State of a known session, or None.
+    """
+    with _lock:
+        return _sessions.get(session_id)
+
+
+def touch_session(session: dict):
+    """
+    Mark a session as used. A long-lived WebSocket can outlast the TTL,
+    so an expired session is put back.
+    """
+    with _lock:
+        session["last_seen"] = time.time()
+        session["messages"] += 1
+        _sessions[session["id"]] = session
+        _sessions.move_to_end(session["id"])
+
+
+def expire_sessions(ttl_sec: float = SESSION_TTL_SEC) -> list:
+    """
+    Remove idle sessions and cancel their pending work. Runs on every
+    get_session(). Returns the dropped session ids.
+    """
+    cutoff = time.time() - ttl_sec
+    stale = []
+    with _lock:
+        # Sessions are kept in last-seen order, so stale ones are at the front
+        while _sessions:
+            session_id, session = next(iter(_sessions.items()))
+            if session["last_seen"] >= cutoff:
+                break
+            del _sessions[session_id]
+            stale.append(session_id)
+    _drop(stale)
+    return stale
+
+
+def active_sessions() -> int:
+    return len(_sessions)
@@ -1,6 +1,8 @@
 import json
 import os
 
+from backend import metrics_store
+
 MEMORY_FILE = os.path.join(os.path.dirname(__file__), "memory", "user_profile.json")
 
 # Ensure the memory folder exists
@@ -25,21 +27,44 @@ def save_profile(profile):
 
 
 def update_profile(key, value):
+    update_profile_fields({key: value})
+
+
+def update_profile_fields(fields):
+    """
+    Save several fields with a single load/save of the profile file.
+    """
     profile = load_profile()
-    profile[key] = value
+    profile.update(fields)
     save_profile(profile)
 
+    # Keep body measurements over time; the profile only has the latest
+    measurements = {}
+    for key in ("weight", "height"):
+        try:
+            if key in fields:
+                measurements[key] = float(fields[key])
+        except (TypeError, ValueError):
+            pass
+    # The profile is saved either way; a rejected measurement must not break the chat
+    if measurements:
+        try:
+            metrics_store.append(metrics_store.DEFAULT_USER, **measurements)
+        except ValueError as e:
+            print("Measurement not stored →", e)
+
 
 def get_profile():
     return load_profile()
 
 
-def missing_fields():
+def missing_fields(profile=None):
     required = [
         "age", "weight", "height", "gender",
         "goal", "level", "training_days", "equipment"
     ]
-    profile = load_profile()
+    if profile is None:
+        profile = load_profile()
     return [field for field in required if field not in profile or not profile[field]]
 
 
@@ -47,9 +72,7 @@ def reset_profile():
     save_profile({})
 
 
+# Not run at import: the app resets the profile in its startup event,
+# so scripts and benchmarks importing this module leave it alone
 def auto_reset_on_start():
     save_profile({})
-
-
-# Run on app startup
-auto_reset_on_start()
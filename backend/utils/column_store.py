@@ -0,0 +1,122 @@
+import os
+import re
+import threading
+import time
+
+import numpy as np
+
+# Rows read at a time when aggregating long histories
+CHUNK_ROWS = 65536
+
+# Appended timestamps may be at most this far ahead of the clock
+MAX_FUTURE_SEC = 24 * 3600
+
+
+class ColumnStore:
+    """
+    Append-only per-user columnar storage: one raw binary file per
+    column under <root>/<user>/, sorted by the time column.
+
+    Reads memory-map the files, so range lookups are a binary search and
+    only the requested slice is paged in.
+    """
+
+    def __init__(self, root: str, dtypes: dict, time_column: str = "timestamp"):
+        self.root = root
+        self.dtypes = {name: np.dtype(dtype) for name, dtype in dtypes.items()}
+        self.time_column = time_column
+        self._lock = threading.Lock()
+
+    def user_dir(self, user_id: str) -> str:
+        safe = re.sub(r"[^A-Za-z0-9_-]", "_", user_id or "default")
+        return os.path.join(self.root, safe)
+
+    def column_path(self, user_id: str, column: str) -> str:
+        return os.path.join(self.user_dir(user_id), f"{column}.bin")
+
+    def open_column(self, user_id: str, column: str, rows: int):
+        if rows == 0:
+            return np.empty(0, dtype=self.dtypes[column])
+        return np.memmap(self.column_path(user_id, column), dtype=self.dtypes[column], mode="r", shape=(rows,))
+
+    def row_count(self, user_id: str) -> int:
+        """
+        Rows present in every column (a crash mid-append can leave one column longer).
+        """
+        counts = []
+        for column, dtype in self.dtypes.items():
+            path = self.column_path(user_id, column)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            counts.append(size // dtype.itemsize)
+        return min(counts)
+
+    def append(self, user_id: str, rows: dict) -> int:
+        """
+        Append rows given as {column: sequence}. Timestamps must be
+        positive epoch seconds, no more than MAX_FUTURE_SEC ahead, sorted
+        and not older than the last stored row; raises ValueError
+        otherwise. Returns the new row count.
+        """
+        arrays = {column: np.asarray(rows[column], dtype=dtype) for column, dtype in self.dtypes.items()}
+        times = arrays[self.time_column]
+        if len(times) == 0:
+            return self.row_count(user_id)
+        # One far-future row (e.g. milliseconds) would block every later append
+        if not np.all(np.isfinite(times)) or times.min() <= 0 or times.max() > time.time() + MAX_FUTURE_SEC:
+            raise ValueError("Timestamps must be epoch seconds and not in the future")
+        if np.any(np.diff(times) < 0):
+            raise ValueError("Rows must be in time order")
+
+        with self._lock:
+            os.makedirs(self.user_dir(user_id), exist_ok=True)
+            count = self.row_count(user_id)
+
+            if count and times[0] < self.open_column(user_id, self.time_column, count)[count - 1]:
+                raise ValueError("Rows must be appended in time order")
+
+            for column, values in arrays.items():
+                with open(self.column_path(user_id, column), "ab") as f:
+                    # Trim a partial row left by an earlier crash before appending
+                    f.truncate(count * self.dtypes[column].itemsize)
+                    f.write(values.tobytes())
+
+            return count + len(times)
+
+    def bounds(self, user_id: str, start: float = None, end: float = None) -> tuple:
+        """
+        (rows, lo, hi) for start <= time <= end, by binary search.
+        """
+        rows = self.row_count(user_id)
+        times = self.open_column(user_id, self.time_column, rows)
+
+        lo = 0 if start is None else int(np.searchsorted(times, start, side="left"))
+        hi = rows if end is None else int(np.searchsorted(times, end, side="right"))
+        return rows, lo, max(lo, hi)
+
+    def read(self, user_id: str, start: float = None, end: float = None) -> dict:
+        """
+        Copy of every column for a time range.
+        """
+        rows, lo, hi = self.bounds(user_id, start, end)
+        return {column: np.array(self.open_column(user_id, column, rows)[lo:hi]) for column in self.dtypes}
+
+    def iter_chunks(self, user_id: str, start: float = None, end: float = None, chunk_rows: int = CHUNK_ROWS):
+        """
+        Yield a time range as float64 column slices of at most chunk_rows,
+        so memory stays bounded however long the history is.
+        """
+        rows, lo, hi = self.bounds(user_id, start, end)
+        columns = {column: self.open_column(user_id, column, rows) for column in self.dtypes}
+        for offset in range(lo, hi, chunk_rows):
+            stop = min(offset + chunk_rows, hi)
+            yield {column: np.asarray(values[offset:stop], dtype=np.float64) for column, values in columns.items()}
+
+    def time_span(self, user_id: str, start: float = None, end: float = None):
+        """
+        (first, last) timestamp in the range, or None if it is empty.
+        """
+        rows, lo, hi = self.bounds(user_id, start, end)
+        if hi <= lo:
+            return None
+        times = self.open_column(user_id, self.time_column, rows)
+        return float(times[lo]), float(times[hi - 1])
@@ -1 +1,229 @@
+import re
+import unicodedata
 
+LB_TO_KG = 0.45359237
+INCH_TO_CM = 2.54
+
+PROFILE_FIELDS = (
+    "age", "weight", "height", "gender",
+    "goal", "level", "training_days", "equipment",
+)
+
+# Quote-like characters users type for feet/inches, folded to ' and "
+_QUOTES = str.maketrans({
+    "’": "'", "‘": "'", "′": "'", "´": "'", "`": "'",
+    "“": '"', "”": '"', "″": '"',
+})
+_SPACES_RE = re.compile(r"\s+")
+
+_WORD_NUMBERS = {
+    "one": 1, "two": 2, "three": 3, "four": 4,
+    "five": 5, "six": 6, "seven": 7,
+}
+
+_GENDERS = {
+    "male": "male", "man": "male", "guy": "male", "boy": "male",
+    "female": "female", "woman": "female", "girl": "female", "lady": "female",
+}
+
+_GOALS = {
+    "weight loss": "weight loss", "lose weight": "weight loss", "fat loss": "weight loss",
+    "lose fat": "weight loss", "cut": "weight loss", "cutting": "weight loss", "slim down": "weight loss",
+    "build muscle": "muscle gain", "muscle gain": "muscle gain", "gain muscle": "muscle gain",
+    "bulk": "muscle gain", "bulking": "muscle gain", "hypertrophy": "muscle gain",
+    "get stronger": "strength training", "strength": "strength training", "powerlifting": "strength training",
+    "endurance": "endurance", "stamina": "endurance", "cardio": "endurance",
+    "general fitness": "general fitness", "stay fit": "general fitness", "get fit": "general fitness",
+    "tone up": "general fitness", "stay healthy": "general fitness",
+}
+
+_LEVELS = {
+    "beginner": "beginner", "novice": "beginner", "newbie": "beginner",
+    "new to the gym": "beginner", "new to lifting": "beginner", "new to training": "beginner",
+    "intermediate": "intermediate",
+    "advanced": "advanced", "experienced": "advanced",
+}
+
+_EQUIPMENT = {
+    "dumbbells": "dumbbells", "dumbbell": "dumbbells",
+    "barbell": "barbell", "barbells": "barbell",
+    "kettlebells": "kettlebells", "kettlebell": "kettlebells",
+    "resistance bands": "resistance bands", "bands": "resistance bands",
+    "full gym": "full gym", "gym": "full gym", "machines": "machines",
+    "pull up bar": "pull-up bar", "pull-up bar": "pull-up bar",
+    "bodyweight": "bodyweight", "no equipment": "bodyweight",
+}
+
+
+def _alternation(words) -> str:
+    # Longest first so "full gym" wins over "gym"
+    return "|".join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+
+
+_NUM = r"\d{1,3}(?:\.\d+)?"
+_WEIGHT_UNIT = r"(?:kgs?|kilos?|kilograms?|lbs?|pounds?)\b"
+
+# Numeric fields, with the range a real answer falls in
+_PLAUSIBLE = {
+    "age": (10, 100),
+    "weight": (25, 350),
+    "height": (100, 250),
+    "training_days": (1, 7),
+}
+
+# One pattern for every field: each top-level alternative is a named
+# group, so a single finditer() pass tells which field matched.
+_PROFILE_RE = re.compile(
+    rf"""
+      (?P<height_ftin>\b(?P<ft>[3-7])\s*(?:'|ft\b|feet\b|foot\b)\s*
+          (?:(?P<inch>\d{{1,2}}(?:\.\d+)?)\s*(?:"|in\b|inch(?:es)?\b)?)?)
+    | (?P<height_cm>\b(?P<cm>{_NUM})\s*(?:cm|centimet(?:er|re)s?)\b)
+    | (?P<height_m>\b(?P<m>[12]\.\d{{1,2}})\s*(?:m|meters?|metres?)\b)
+    | (?P<weight_change>\b(?:lost|lose|losing|dropped|drop|shed|gained|gain|gaining|put\s*on|down|up)
+          \s*(?:about\s*|around\s*|over\s*)?{_NUM}\s*{_WEIGHT_UNIT})
+    | (?P<weight_lift>\b(?:squat|bench|deadlift|press|lift|curl|row|clean|snatch)\w*[^.,;!?\d]{{0,20}}?
+          {_NUM}\s*{_WEIGHT_UNIT}
+          |\b{_NUM}\s*{_WEIGHT_UNIT}\s*(?:for|x)\s*\d+)
+    | (?P<weight>(?P<weight_said>\b(?:i\s*weigh|weigh(?:s|ing)?|(?:body\s*)?weight\s*(?:is|of|:|=)?|i(?:'m|\s*am))
+          \s*(?:about\s*|around\s*)?)?
+          \b(?P<wnum>{_NUM})\s*(?P<wunit>{_WEIGHT_UNIT}))
+    | (?P<age>\b(?P<years>\d{{1,2}})\s*(?:years?\s*old|yrs?\s*old|y/?o)\b
+          |\bage(?:d)?\s*(?:is\s*|of\s*|:\s*)?(?P<age_num>\d{{1,2}})\b
+          |\bi(?:'m|\s*am)\s*(?P<age_me>\d{{1,2}})(?=\s*(?:$|[,;!]|\.(?!\d)|and\b|years?\b|yrs?\b)))
+    | (?P<training_days>\b(?P<days>[1-7]|{_alternation(_WORD_NUMBERS)})\s*
+          (?:days?|x|times)\s*(?:a|per|/|each|every)?\s*(?:week|wk)\b
+          |\b(?P<daily>every\s*day|daily)\b)
+    | (?P<gender>\b(?:{_alternation(_GENDERS)})\b)
+    | (?P<goal>\b(?:{_alternation(_GOALS)})\b)
+    | (?P<level>\b(?:{_alternation(_LEVELS)})\b)
+    | (?P<equipment>\b(?:{_alternation(_EQUIPMENT)})\b)
+    """,
+    re.VERBOSE,
+)
+
+_BARE_NUMBER_RE = re.compile(rf"^\s*(?P<num>{_NUM})\s*$")
+
+
+def normalize(text: str) -> str:
+    """
+    NFKC-normalize, fold quote variants, lowercase and collapse whitespace.
+    """
+    text = unicodedata.normalize("NFKC", text).translate(_QUOTES)
+    return _SPACES_RE.sub(" ", text).strip().lower()
+
+
+def _round(value: float) -> float:
+    return round(value, 1)
+
+
+def extract_profile_fields(text: str, expected: str = None) -> dict:
+    """
+    Pull profile fields out of free text in one regex pass, with weight
+    in kg and height in cm.
+
+    `expected` is the field the assistant just asked for. A bare number
+    answer ("25") is assigned to it, and a lone keyword ("gym", "male")
+    only counts when it answers it or comes with a real measurement.
+    "N kg" is body weight only with weight wording ("I weigh", "I'm"),
+    next to height or age, or when weight was asked for; lifts
+    ("squat 100 kg") are ignored.
+
+    >>> extract_profile_fields("I'm 5'10, 180 lbs, 3 days a week with dumbbells")
+    {'height': 177.8, 'weight': 81.6, 'training_days': 3, 'equipment': 'dumbbells'}
+    >>> extract_profile_fields("I'm 25, male")
+    {'age': 25, 'gender': 'male'}
+    >>> extract_profile_fields("25", expected="age")
+    {'age': 25}
+    >>> extract_profile_fields("the full gym", expected="equipment")
+    {'equipment': 'full gym'}
+    >>> extract_profile_fields("I weigh 180 lbs")
+    {'weight': 81.6}
+    >>> extract_profile_fields("80 kg", expected="weight")
+    {'weight': 80.0}
+    >>> extract_profile_fields("I lost 5 lbs this week")
+    {}
+    >>> extract_profile_fields("I can squat 100 kg for 5 reps")
+    {}
+    >>> extract_profile_fields("my bench is 225 lbs")
+    {}
+    >>> extract_profile_fields("did 60kg x 8 today")
+    {}
+    >>> extract_profile_fields("I have been lifting for 2 years")
+    {}
+    >>> extract_profile_fields("Give me a cardio workout", expected="age")
+    {}
+    >>> extract_profile_fields("thanks man")
+    {}
+    >>> extract_profile_fields("calories 70 175 30 male medium")
+    {}
+    """
+    clean = normalize(text)
+    fields = {}
+    equipment = []
+    weight_said = False
+
+    for match in _PROFILE_RE.finditer(clean):
+        kind = match.lastgroup
+        value = match.group(kind)
+
+        if kind == "height_ftin":
+            inches = int(match.group("ft")) * 12 + float(match.group("inch") or 0)
+            fields.setdefault("height", _round(inches * INCH_TO_CM))
+        elif kind == "height_cm":
+            fields.setdefault("height", _round(float(match.group("cm"))))
+        elif kind == "height_m":
+            fields.setdefault("height", _round(float(match.group("m")) * 100))
+        elif kind == "weight":
+            weight = float(match.group("wnum"))
+            if match.group("wunit").startswith(("lb", "pound")):
+                weight *= LB_TO_KG
+            if "weight" not in fields:
+                fields["weight"] = _round(weight)
+                weight_said = bool(match.group("weight_said"))
+        elif kind == "age":
+            age = match.group("years") or match.group("age_num") or match.group("age_me")
+            fields.setdefault("age", int(age))
+        elif kind == "training_days":
+            days = match.group("days")
+            if match.group("daily"):
+                fields.setdefault("training_days", 7)
+            else:
+                fields.setdefault("training_days", _WORD_NUMBERS.get(days) or int(days))
+        elif kind == "gender":
+            fields.setdefault("gender", _GENDERS[value])
+        elif kind == "goal":
+            fields.setdefault("goal", _GOALS[value])
+        elif kind == "level":
+            fields.setdefault("level", _LEVELS[value])
+        elif kind == "equipment":
+            item = _EQUIPMENT[value]
+            if item not in equipment:
+                equipment.append(item)
+        # weight_change ("lost 5 lbs") and weight_lift ("squat 100 kg") are
+        # matched only so they are not read as body weight
+
+    if equipment:
+        fields["equipment"] = ", ".join(equipment)
+
+    # "100 kg" alone is as likely a lift or a target as a body weight
+    if "weight" in fields and not (
+        weight_said or expected == "weight" or fields.keys() & {"height", "age"}
+    ):
+        del fields["weight"]
+
+    if not fields and expected in _PLAUSIBLE:
+        bare = _BARE_NUMBER_RE.match(clean)
+        if bare:
+            number = float(bare.group("num"))
+            fields[expected] = int(number) if expected in ("age", "training_days") else _round(number)
+
+    fields = {
+        key: value for key, value in fields.items()
+        if key not in _PLAUSIBLE or _PLAUSIBLE[key][0] <= value <= _PLAUSIBLE[key][1]
+    }
+
+    # Keywords alone are too common in ordinary chat to trust
+    if not fields.keys() & _PLAUSIBLE.keys():
+        fields = {key: value for key, value in fields.items() if key == expected}
+
+    return fields
@@ -0,0 +1,252 @@
+import os
+import threading
+import time
+
+import numpy as np
+
+from backend.agents.workout_tool import SECONDS_PER_REP
+from backend.utils.column_store import CHUNK_ROWS, MAX_FUTURE_SEC, ColumnStore
+
+STORE_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "workouts")
+
+TIME_COLUMN = "timestamp"
+WEEK_SEC = 7 * 24 * 3600
+
+# One row per exercise entry of a session; all rows of a session share its timestamp
+store = ColumnStore(STORE_DIR, {
+    TIME_COLUMN: np.float64,
+    "exercise": np.uint32,
+    "sets": np.uint16,
+    "reps": np.uint16,
+    "weight": np.float32,
+    "rest_sec": np.float32,
+})
+
+# Upper bounds for one entry; sets and reps are stored as uint16
+MAX_SETS = 100
+MAX_REPS = 1000
+MAX_WEIGHT_KG = 1000
+MAX_REST_SEC = 3600
+
+_names_lock = threading.Lock()
+_exercise_ids = {}
+
+
+# ----------------------------
+#   Exercise Dictionary
+# ----------------------------
+def _names_path(user_id: str) -> str:
+    return os.path.join(store.user_dir(user_id), "exercises.txt")
+
+
+def _load_names(user_id: str) -> dict:
+    """
+    name → id for a user, one name per line in id order.
+    """
+    key = store.user_dir(user_id)
+    if key not in _exercise_ids:
+        names = {}
+        path = _names_path(user_id)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    names.setdefault(line.rstrip("\n"), len(names))
+        _exercise_ids[key] = names
+    return _exercise_ids[key]
+
+
+def _clean_name(name: str) -> str:
+    return " ".join(str(name).lower().split())
+
+
+def _save_names(user_id: str, names: dict, new_names: list):
+    """
+    Append new names to the dictionary file; caller holds _names_lock.
+    """
+    os.makedirs(store.user_dir(user_id), exist_ok=True)
+    with open(_names_path(user_id), "a", encoding="utf-8") as f:
+        f.writelines(name + "\n" for name in new_names)
+    for name in new_names:
+        names[name] = len(names)
+
+
+def exercise_names(user_id: str) -> list:
+    with _names_lock:
+        names = _load_names(user_id)
+        return sorted(names, key=names.get)
+
+
+# ----------------------------
+#   Ingest
+# ----------------------------
+def log_session(user_id: str, exercises: list, timestamp: float = None) -> int:
+    """
+    Record one training session. `exercises` holds dicts with exercise,
+    sets, reps and optional weight (kg) and rest_sec. Returns the user's
+    total number of logged entries.
+    """
+    if not exercises:
+        raise ValueError("A session needs at least one exercise")
+
+    rows = []
+    for entry in exercises:
+        name = _clean_name(entry.get("exercise", ""))
+        if not name:
+            raise ValueError("Every entry needs an exercise name")
+        sets, reps = int(entry.get("sets", 0)), int(entry.get("reps", 0))
+        weight = float(entry.get("weight") or 0)
+        rest = float(entry.get("rest_sec") if entry.get("rest_sec") is not None else 60)
+        if not 1 <= sets <= MAX_SETS:
+            raise ValueError(f"Sets must be between 1 and {MAX_SETS}")
+        if not 1 <= reps <= MAX_REPS:
+            raise ValueError(f"Reps must be between 1 and {MAX_REPS}")
+        if not 0 <= weight <= MAX_WEIGHT_KG:
+            raise ValueError(f"Weight must be between 0 and {MAX_WEIGHT_KG} kg")
+        if not 0 <= rest <= MAX_REST_SEC:
+            raise ValueError(f"Rest must be between 0 and {MAX_REST_SEC} seconds")
+        rows.append((name, sets, reps, weight, rest))
+
+    timestamp = time.time() if timestamp is None else float(timestamp)
+    if not 0 < timestamp <= time.time() + MAX_FUTURE_SEC:
+        raise ValueError("Timestamp must be epoch seconds and not in the future")
+
+    # New names get ids now but are only written once the rows are stored,
+    # so a rejected session leaves the dictionary untouched
+    with _names_lock:
+        names = _load_names(user_id)
+        new_names = [name for name in dict.fromkeys(row[0] for row in rows) if name not in names]
+        ids = {**names, **{name: len(names) + i for i, name in enumerate(new_names)}}
+
+        count = store.append(user_id, {
+            TIME_COLUMN: [timestamp] * len(rows),
+            "exercise": [ids[row[0]] for row in rows],
+            "sets": [row[1] for row in rows],
+            "reps": [row[2] for row in rows],
+            "weight": [row[3] for row in rows],
+            "rest_sec": [row[4] for row in rows],
+        })
+        if new_names:
+            _save_names(user_id, names, new_names)
+    return count
+
+
+# ----------------------------
+#   Analytics
+# ----------------------------
+def estimated_1rm(weight: np.ndarray, reps: np.ndarray) -> np.ndarray:
+    """
+    Epley formula; a single rep is its own 1RM.
+    """
+    return np.where(reps <= 1, weight, weight * (1 + reps / 30.0))
+
+
+def duration_minutes(sets: np.ndarray, reps: np.ndarray, rest_sec: np.ndarray) -> np.ndarray:
+    """
+    Vectorized workout_duration_calculator.
+    """
+    return (sets * reps * SECONDS_PER_REP + (sets - 1) * rest_sec) / 60.0
+
+
+def _slopes(values: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """
+    Least-squares slope per row against x (one value per column), ignoring NaNs.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    present = ~np.isnan(values)
+    y = np.where(present, values, 0.0)
+    xs = np.where(present, x, 0.0)
+
+    n = present.sum(axis=1)
+    sx, sy = xs.sum(axis=1), y.sum(axis=1)
+    sxy, sxx = (xs * y).sum(axis=1), (xs * xs).sum(axis=1)
+
+    denom = n * sxx - sx * sx
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(denom > 0, (n * sxy - sx * sy) / denom, np.nan)
+
+
+def _active_weeks(user_id: str, start: float = None, end: float = None) -> np.ndarray:
+    """
+    Sorted week numbers that have at least one entry, read in chunks.
+    """
+    rows, lo, hi = store.bounds(user_id, start, end)
+    times = store.open_column(user_id, TIME_COLUMN, rows)
+    weeks = [
+        np.unique((np.asarray(times[offset:min(offset + CHUNK_ROWS, hi)]) // WEEK_SEC).astype(np.int64))
+        for offset in range(lo, hi, CHUNK_ROWS)
+    ]
+    return np.unique(np.concatenate(weeks)) if weeks else np.empty(0, dtype=np.int64)
+
+
+def analytics(user_id: str, start: float = None, end: float = None, exercise: str = None) -> dict:
+    """
+    Weekly sessions, sets, reps, volume (sets × reps × weight) and
+    duration, plus best estimated 1RM per exercise per week and its
+    trend in kg/week. Data is read in chunks, so memory stays bounded.
+    """
+    # Buckets only for weeks with data, so a long gap costs nothing
+    week_ids = _active_weeks(user_id, start, end)
+    if len(week_ids) == 0:
+        return {"weeks": [], "exercises": {}}
+
+    names = exercise_names(user_id)
+    only = None
+    if exercise:
+        only = {name: i for i, name in enumerate(names)}.get(_clean_name(exercise))
+        if only is None:
+            return {"weeks": [], "exercises": {}}
+
+    n_weeks = len(week_ids)
+
+    totals = {key: np.zeros(n_weeks) for key in ("sessions", "sets", "reps", "volume", "duration_min")}
+    best = np.full((len(names), n_weeks), np.nan)
+    last_time = None
+
+    for chunk in store.iter_chunks(user_id, start, end):
+        times = chunk[TIME_COLUMN]
+        ex, sets, reps = chunk["exercise"].astype(np.int64), chunk["sets"], chunk["reps"]
+        weight, rest = chunk["weight"], chunk["rest_sec"]
+
+        if only is not None:
+            keep = ex == only
+            times, ex, sets, reps, weight, rest = (a[keep] for a in (times, ex, sets, reps, weight, rest))
+            if len(times) == 0:
+                continue
+
+        weeks = np.searchsorted(week_ids, (times // WEEK_SEC).astype(np.int64))
+
+        # A new session starts wherever the timestamp changes
+        previous = np.concatenate(([np.nan if last_time is None else last_time], times[:-1]))
+        totals["sessions"] += np.bincount(weeks, weights=times != previous, minlength=n_weeks)
+        last_time = times[-1]
+
+        totals["sets"] += np.bincount(weeks, weights=sets, minlength=n_weeks)
+        totals["reps"] += np.bincount(weeks, weights=sets * reps, minlength=n_weeks)
+        totals["volume"] += np.bincount(weeks, weights=sets * reps * weight, minlength=n_weeks)
+        totals["duration_min"] += np.bincount(weeks, weights=duration_minutes(sets, reps, rest), minlength=n_weeks)
+
+        e1rm = estimated_1rm(weight, reps)
+        np.fmax.at(best, (ex, weeks), e1rm)
+
+    active = totals["sessions"] > 0
+    week_starts = week_ids * WEEK_SEC
+    weeks_out = [
+        {"week_start": float(week_starts[i]), **{key: round(float(v[i]), 1) for key, v in totals.items()}}
+        for i in np.flatnonzero(active)
+    ]
+
+    slopes = _slopes(best, week_ids)
+    exercises_out = {}
+    for i, name in enumerate(names):
+        row = best[i]
+        logged = np.flatnonzero(~np.isnan(row))
+        if len(logged) == 0:
+            continue
+        exercises_out[name] = {
+            "best_e1rm": round(float(np.nanmax(row)), 1),
+            "latest_e1rm": round(float(row[logged[-1]]), 1),
+            "trend_kg_per_week": None if np.isnan(slopes[i]) else round(float(slopes[i]), 2),
+            "weeks_logged": int(len(logged)),
+        }
+
+    return {"weeks": weeks_out, "exercises": exercises_out}
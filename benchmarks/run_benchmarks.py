@@ -0,0 +1,320 @@
+"""
+Microbenchmarks for the pure-Python code that runs on every message.
+
+    python benchmarks/run_benchmarks.py                  # compare with baseline
+    python benchmarks/run_benchmarks.py --save-baseline  # record a new baseline
+    python benchmarks/run_benchmarks.py --only bmi
+
+Exits with status 1 when a benchmark loses more than --threshold of its
+baseline ops/sec, or allocates more than --threshold above its baseline
+peak. Timings depend on the machine: record the baseline on the same
+machine that runs the comparison.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from backend import chat_logic, metrics_store, sessions, user_memory  # noqa: E402
+from backend.agents import (  # noqa: E402
+    calculate_bmi,
+    calculate_daily_calories,
+    estimate_meal_calories,
+    suggest_workout,
+    workout_duration_calculator,
+)
+from backend.agents.fitness_tools import (  # noqa: E402
+    calculate_body_fat,
+    calculate_heart_rate_zones,
+    calculate_ideal_weight,
+    calculate_macros,
+    calculate_protein_needs,
+    calculate_water_intake,
+)
+from backend.utils.text_cleaner import extract_profile_fields  # noqa: E402
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+LOGS_FILE = os.path.join(ROOT, "data", "logs.csv")
+
+DEFAULT_THRESHOLD = 0.25
+MIN_RUN_SEC = 0.2
+REPEATS = 5
+
+
+# ----------------------------
+#   Inputs from data/logs.csv
+# ----------------------------
+def load_messages() -> list:
+    messages = []
+    if os.path.exists(LOGS_FILE):
+        with open(LOGS_FILE, "r", newline="", encoding="utf-8") as f:
+            messages = [row[1] for row in csv.reader(f) if len(row) >= 3 and row[0] != "Timestamp"]
+    return messages or ["hello", "bmi 70 175", "workout weight loss beginner"]
+
+
+def command_args(messages: list) -> dict:
+    """
+    Group tool commands from the logs ("bmi 70 175", ...) by command
+    and turn them into call arguments.
+    """
+    args = {}
+    for message in messages:
+        words = message.lower().split()
+        if not words:
+            continue
+        try:
+            if words[0] == "bmi" and len(words) == 3:
+                args.setdefault("bmi", []).append((float(words[1]), float(words[2])))
+            elif words[0] == "calories" and len(words) == 6:
+                args.setdefault("calories", []).append(
+                    (float(words[1]), float(words[2]), int(words[3]), words[4], words[5])
+                )
+            elif words[:2] == ["meal", "calories"]:
+                args.setdefault("meal", []).append((words[2:],))
+            elif words[0] == "workout" and len(words) >= 3:
+                args.setdefault("workout", []).append((" ".join(words[1:-1]), words[-1]))
+            elif words[0] == "duration" and len(words) == 4:
+                args.setdefault("duration", []).append(tuple(int(w) for w in words[1:]))
+            elif words[0] == "bodyfat" and len(words) == 5:
+                args.setdefault("bodyfat", []).append(
+                    (float(words[1]), float(words[2]), int(words[3]), words[4])
+                )
+            elif words[0] == "idealweight" and len(words) == 3:
+                args.setdefault("idealweight", []).append((float(words[1]), words[2]))
+            elif words[0] in ("protein", "water") and len(words) >= 2:
+                args.setdefault(words[0], []).append((float(words[1]), *words[2:3]))
+            elif words[0] == "heartrate" and len(words) == 2:
+                args.setdefault("heartrate", []).append((int(words[1]),))
+            elif words[0] == "macros" and len(words) >= 2:
+                args.setdefault("macros", []).append((float(words[1]), *words[2:3]))
+        except ValueError:
+            continue
+    return args
+
+
+# ----------------------------
+#   Isolation
+# ----------------------------
+class FakeGemini:
+    """
+    Answers instantly with a short text, so routing benchmarks measure
+    the local work and not the network. Too short to be learned by the
+    knowledge base.
+    """
+
+    REPLY = "ok"
+
+    def generate_content(self, contents, stream=False):
+        if stream:
+            return [SimpleNamespace(text=self.REPLY)]
+        part = SimpleNamespace(text=self.REPLY, function_call=None)
+        return SimpleNamespace(candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))])
+
+
+def isolate():
+    """
+    Point every file the chat flow writes at a temp dir and replace the
+    Gemini client, so benchmarks leave the real profile and metrics alone.
+    """
+    scratch = tempfile.mkdtemp(prefix="gymai-bench-")
+    user_memory.MEMORY_FILE = os.path.join(scratch, "user_profile.json")
+    metrics_store.store.root = os.path.join(scratch, "metrics")
+    chat_logic.get_client = lambda *args, **kwargs: FakeGemini()
+
+
+# ----------------------------
+#   Benchmarks
+# ----------------------------
+def build_benchmarks() -> dict:
+    messages = load_messages()
+    args = command_args(messages)
+
+    def calls(fn, key, fallback):
+        inputs = args.get(key) or [fallback]
+        return lambda: [fn(*a) for a in inputs]
+
+    # The logged messages, then a profile conversation down to the plan
+    # choice, through the real generate_response and one session.
+    # Each run starts from an empty profile.
+    conversation = messages + [
+        "can you build me a profile?",
+        "30",
+        "70 kg",
+        "175 cm",
+        "male",
+        "I want to build muscle",
+        "beginner",
+        "3 days a week",
+        "dumbbells",
+        "both",
+    ]
+    session_id = sessions.get_session()["id"]
+
+    def routing():
+        user_memory.reset_profile()
+        session = sessions.find_session(session_id)
+        session.pop("expected_field", None)
+        session.pop("awaiting_plan_choice", None)
+        for message in conversation:
+            chat_logic.generate_response(message, session_id)
+
+    # Typical free-text profile answers, plus everything users sent
+    profile_answers = [
+        "I'm 5'10, 180 lbs, 3 days a week with dumbbells",
+        "25 years old, female, 165 cm, 60 kg",
+        "I want to build muscle, I'm a beginner",
+        "5 ft 4 in, 130 pounds, four times per week at the full gym",
+    ] + messages
+
+    def extract():
+        for message in profile_answers:
+            extract_profile_fields(message)
+
+    stored_profile = {
+        "age": "30", "weight": "70", "height": "175", "gender": "male",
+        "goal": "muscle gain", "level": "beginner", "training_days": "3", "equipment": "dumbbells",
+    }
+
+    def memory_roundtrip():
+        user_memory.save_profile(stored_profile)
+        user_memory.load_profile()
+
+    return {
+        "suggest_workout": calls(suggest_workout, "workout", ("weight loss", "beginner")),
+        "estimate_meal_calories": calls(estimate_meal_calories, "meal", (["apple", "chicken breast", "rice"],)),
+        "calculate_bmi": calls(calculate_bmi, "bmi", (70.0, 175.0)),
+        "calculate_daily_calories": calls(calculate_daily_calories, "calories", (70.0, 175.0, 30, "male", "medium")),
+        "workout_duration_calculator": calls(workout_duration_calculator, "duration", (3, 10, 60)),
+        "calculate_body_fat": calls(calculate_body_fat, "bodyfat", (70.0, 175.0, 30, "male")),
+        "calculate_ideal_weight": calls(calculate_ideal_weight, "idealweight", (175.0, "male")),
+        "calculate_protein_needs": calls(calculate_protein_needs, "protein", (70.0,)),
+        "calculate_water_intake": calls(calculate_water_intake, "water", (70.0,)),
+        "calculate_heart_rate_zones": calls(calculate_heart_rate_zones, "heartrate", (30,)),
+        "calculate_macros": calls(calculate_macros, "macros", (2000.0,)),
+        "user_memory_save_load": memory_roundtrip,
+        "routing_checks": routing,
+        "text_cleaner_extract": extract,
+    }
+
+
+def ops_per_sec(fn) -> float:
+    """
+    Best of REPEATS runs, each long enough to be measured reliably.
+    """
+    fn()
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_RUN_SEC:
+            break
+        loops *= 2
+
+    best = elapsed
+    for _ in range(REPEATS - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        best = min(best, time.perf_counter() - start)
+    return loops / best
+
+
+def peak_alloc_bytes(fn) -> int:
+    """
+    Peak traced memory of a single call, above what was live before it.
+    """
+    fn()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return max(0, peak - before)
+
+
+def run(only: str = None, names: set = None) -> dict:
+    isolate()
+    results = {}
+    for name, fn in build_benchmarks().items():
+        if (only and only not in name) or (names is not None and name not in names):
+            continue
+        results[name] = {"ops_per_sec": round(ops_per_sec(fn), 1), "peak_alloc_bytes": peak_alloc_bytes(fn)}
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    failures = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if result["ops_per_sec"] < base["ops_per_sec"] * (1 - threshold):
+            failures.append(f"{name}: {result['ops_per_sec']:.0f} ops/s < baseline {base['ops_per_sec']:.0f}")
+        # Small absolute slack so a few stray bytes don't fail tiny benchmarks
+        allowed = base["peak_alloc_bytes"] * (1 + threshold) + 256
+        if result["peak_alloc_bytes"] > allowed:
+            failures.append(
+                f"{name}: peak alloc {result['peak_alloc_bytes']} B > baseline {base['peak_alloc_bytes']} B"
+            )
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run GymAI hot-path microbenchmarks.")
+    parser.add_argument("--save-baseline", action="store_true", help="write results to baseline.json")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed regression as a fraction (default 0.25)")
+    parser.add_argument("--only", help="run benchmarks whose name contains this text")
+    opts = parser.parse_args()
+
+    results = run(opts.only)
+
+    baseline = {}
+    if os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE, "r") as f:
+            baseline = json.load(f)
+
+    # Re-measure apparent regressions once; a busy machine can cause one slow run
+    if not opts.save_baseline:
+        suspects = {failure.split(":")[0] for failure in compare(results, baseline, opts.threshold)}
+        if suspects:
+            results.update(run(names=suspects))
+
+    print(f"{'benchmark':<30} {'ops/sec':>14} {'baseline':>14} {'peak alloc':>12}")
+    for name, result in results.items():
+        base = baseline.get(name, {}).get("ops_per_sec")
+        print(f"{name:<30} {result['ops_per_sec']:>14,.0f} {base or 0:>14,.0f} {result['peak_alloc_bytes']:>10} B")
+
+    if opts.save_baseline:
+        baseline.update(results)
+        with open(BASELINE_FILE, "w") as f:
+            json.dump(baseline, f, indent=4, sort_keys=True)
+        print(f"\nBaseline saved to {BASELINE_FILE}")
+        return 0
+
+    failures = compare(results, baseline, opts.threshold)
+    if failures:
+        print("\nRegressions:")
+        for failure in failures:
+            print(f"  ✗ {failure}")
+        return 1
+
+    print("\n✓ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,9 +10,75 @@ window.addEventListener("DOMContentLoaded", () => {
 
     // Add single clean welcome message
     addMessage("Hey there! I'm GymAI. How can I help you achieve your fitness goals today?", "assistant");
+
+    connectSocket();
 });
 
 
+//-----------------------------------------------------
+// WEBSOCKET CONNECTION (falls back to HTTP /chat)
+//-----------------------------------------------------
+let socket = null;
+let sessionId = sessionStorage.getItem("gymai-session-id");
+let pendingReply = null;   // { bubble, text, resolve } for the message in flight
+
+function connectSocket() {
+    if (!("WebSocket" in window)) return;
+
+    const protocol = window.location.protocol === "https:" ? "wss:" : "ws:";
+    const query = sessionId ? `?session_id=${encodeURIComponent(sessionId)}` : "";
+
+    try {
+        socket = new WebSocket(`${protocol}//${window.location.host}/ws/chat${query}`);
+    } catch (err) {
+        socket = null;
+        return;
+    }
+
+    socket.onmessage = (event) => {
+        const data = JSON.parse(event.data);
+
+        if (data.type === "session") {
+            sessionId = data.session_id;
+            sessionStorage.setItem("gymai-session-id", sessionId);
+        } else if (data.type === "ping") {
+            socket.send(JSON.stringify({ type: "pong" }));
+        } else if (data.type === "chunk" && pendingReply) {
+            if (!pendingReply.bubble) {
+                hideTyping();
+                pendingReply.bubble = addMessage("", "assistant");
+            }
+            pendingReply.text += data.text;
+            pendingReply.bubble.innerHTML = formatMessage(pendingReply.text);
+            scrollToBottom();
+        } else if ((data.type === "done" || data.type === "error") && pendingReply) {
+            if (data.type === "error" || !pendingReply.bubble) {
+                hideTyping();
+                addMessage("Sorry, I couldn't process your request.", "assistant", true);
+            }
+            pendingReply.resolve();
+            pendingReply = null;
+        }
+    };
+
+    socket.onclose = () => {
+        socket = null;
+        if (pendingReply) {
+            hideTyping();
+            addMessage("Connection error. Please try again.", "assistant", true);
+            pendingReply.resolve();
+            pendingReply = null;
+        }
+        // Reconnect quietly; HTTP is used in the meantime
+        setTimeout(connectSocket, 3000);
+    };
+}
+
+function socketReady() {
+    return socket !== null && socket.readyState === WebSocket.OPEN;
+}
+
+
 //-----------------------------------------------------
 // ADD MESSAGE TO CHAT
 //-----------------------------------------------------
@@ -34,6 +100,14 @@ function addMessage(text, role, isError = false) {
     row.appendChild(bubble);
     chatBox.appendChild(row);
 
+    scrollToBottom();
+    return bubble;
+}
+
+
+function scrollToBottom() {
+    const chatBox = document.getElementById("chat-box");
+
     // Auto scroll to bottom
     setTimeout(() => {
         chatBox.scrollTop = chatBox.scrollHeight;
@@ -85,17 +159,43 @@ async function sendMessage() {
 
     showTyping();
 
+    if (socketReady()) {
+        await sendOverSocket(text);
+    } else {
+        await sendOverHttp(text);
+    }
+
+    // Re-enable UI
+    input.disabled = false;
+    sendBtn.disabled = false;
+    input.focus();
+}
+
+
+function sendOverSocket(text) {
+    return new Promise((resolve) => {
+        pendingReply = { bubble: null, text: "", resolve };
+        socket.send(JSON.stringify({ type: "message", message: text }));
+    });
+}
+
+
+async function sendOverHttp(text) {
     try {
         const response = await fetch("/chat", {
             method: "POST",
             headers: { "Content-Type": "application/json" },
-            body: JSON.stringify({ message: text })
+            body: JSON.stringify({ message: text, session_id: sessionId })
         });
 
         const data = await response.json();
         hideTyping();
 
         if (response.ok && data.response) {
+            if (data.session_id) {
+                sessionId = data.session_id;
+                sessionStorage.setItem("gymai-session-id", sessionId);
+            }
             addMessage(data.response, "assistant");
         } else {
             addMessage("Sorry, I couldn't process your request.", "assistant", true);
@@ -104,11 +204,6 @@ async function sendMessage() {
         hideTyping();
         addMessage("Connection error. Please try again.", "assistant", true);
     }
-
-    // Re-enable UI
-    input.disabled = false;
-    sendBtn.disabled = false;
-    input.focus();
 }
 
 